@@ -0,0 +1,60 @@
+from typing import NamedTuple, Dict
+import numpy as np
+
+periods = ("day", "week", "month")
+
+
+class Buckets(NamedTuple):
+    start: np.ndarray
+    count: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    mean: np.ndarray
+    percentiles: Dict[float, np.ndarray]
+
+
+def bucketStarts(dates, period: str = "day"):
+    days = np.asarray(dates, dtype="datetime64[D]")
+
+    if period == "day":
+        return days
+    if period == "week":
+        # Weeks start on monday, 1970-01-01 was a thursday
+        return days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    if period == "month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+
+    raise ValueError(f"Unknown period: {period}, expected one of {periods}")
+
+
+def aggregate(dates, values, period: str = "day", percentiles=()):
+    starts, group = np.unique(bucketStarts(dates, period), return_inverse=True)
+    values = np.asarray(values)
+
+    if not len(values):
+        empty = values[:0]
+        return Buckets(start=starts, count=np.zeros(0, dtype=np.int64), min=empty, max=empty, mean=np.zeros(0),
+                       percentiles={q: np.zeros(0) for q in percentiles})
+
+    # Sorting by bucket and then by value puts every bucket's values in one contiguous, ordered run
+    order = np.lexsort((values, group))
+    ordered = values[order]
+    count = np.bincount(group, minlength=len(starts))
+    first = np.concatenate(([0], np.cumsum(count)[:-1]))
+    last = first + count - 1
+
+    buckets_percentiles = {}
+    for q in percentiles:
+        position = first + (count - 1) * q / 100
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        buckets_percentiles[q] = ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+    return Buckets(
+        start=starts,
+        count=count,
+        min=ordered[first],
+        max=ordered[last],
+        mean=np.add.reduceat(ordered, first) / count,
+        percentiles=buckets_percentiles,
+    )
@@ -0,0 +1,63 @@
+import shutil
+import subprocess
+import numpy as np
+from PIL import GifImagePlugin, Image
+
+formats = (".gif", ".mp4", ".webp")
+
+
+class GifEncoder:
+    # Frames are written as they arrive, only the previous frame is kept to crop the next one to the changed region
+    mode = "P"
+
+    def __init__(self, path: str, fps: float):
+        self.file = open(path, "wb")
+        self.duration = int(1000 / fps)
+        self.previous = None
+
+    def write(self, frame: Image.Image):
+        pixels = np.asarray(frame)
+
+        if self.previous is None:
+            header, _ = GifImagePlugin.getheader(frame, info={"loop": 0, "duration": self.duration, "optimize": False})
+            self.file.writelines(header)
+            box = (0, 0) + frame.size
+        else:
+            rows, columns = np.nonzero(pixels != self.previous)
+            # An unchanged frame still needs one pixel to carry its duration
+            box = (columns.min(), rows.min(), columns.max() + 1, rows.max() + 1) if len(rows) else (0, 0, 1, 1)
+
+        self.file.writelines(GifImagePlugin.getdata(frame.crop(box), offset=box[:2], duration=self.duration, disposal=1))
+        self.previous = pixels
+
+    def close(self):
+        self.file.write(b";")
+        self.file.close()
+
+
+class FfmpegEncoder:
+    # Raw frames are piped into ffmpeg, which encodes them as they come in
+    mode = "RGB"
+    codecs = {
+        ".mp4": ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"],
+        ".webp": ["-c:v", "libwebp_anim", "-loop", "0"],
+    }
+
+    def __init__(self, path: str, fps: float, size, extension: str):
+        from matplotlib import rcParams
+
+        ffmpeg = shutil.which(rcParams["animation.ffmpeg_path"])
+        if ffmpeg is None:
+            raise RuntimeError(f"Writing {extension} animations needs ffmpeg, set animation.ffmpeg_path or put it on the PATH")
+
+        self.process = subprocess.Popen([ffmpeg, "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{size[0]}x{size[1]}",
+                                         "-r", str(fps), "-i", "-", *self.codecs[extension], path], stdin=subprocess.PIPE)
+
+    def write(self, frame: Image.Image):
+        self.process.stdin.write(frame.tobytes())
+
+    def close(self):
+        self.process.stdin.close()
+
+        if self.process.wait():
+            raise RuntimeError(f"ffmpeg exited with status {self.process.returncode}")
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import os
+import random
+import time
+from urllib.parse import quote
+import requests
+from requests.adapters import HTTPAdapter
+import Instrumentation
+from LoadBinaryStats import LoadBinaryStats
+from PageFetcher import PageError, PageFetcher
+from ResponseCache import ResponseCache
+from StatsScraper import StatsScraper
+
+retry_statuses = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    # One bucket is shared by every account, so the crawl as a whole stays under rate requests per second
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncCrawler:
+    def __init__(self, max_requests_per_second: float = 5, max_connections: int = 8, retries: int = 5, backoff_seconds: float = 1,
+                 max_backoff_seconds: float = 60, checkpoint_dir: str = None, checkpoint_pages: int = 20,
+                 link: str = "https://data.typeracer.com/pit/race_history", timeout: float = 30, response_cache: ResponseCache = None):
+        self.max_requests_per_second = max_requests_per_second
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint_pages = checkpoint_pages
+        self.link = link
+        self.timeout = timeout
+        self.errors = {}
+
+        # One pooled session for every account, requests sessions are shared between the worker threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.fetcher = PageFetcher(link, session=self.session, cache=response_cache)
+
+    def crawl(self, accounts, store=None, start_date=None):
+        # accounts are (username, universe) pairs, with a store only races newer than the stored ones are fetched
+        return asyncio.run(self.crawlAsync(accounts, store, start_date))
+
+    async def crawlAsync(self, accounts, store=None, start_date=None):
+        accounts = list(dict.fromkeys((username, universe) for username, universe in accounts))
+        bucket = TokenBucket(self.max_requests_per_second)
+        connections = asyncio.Semaphore(self.max_connections)
+
+        known = {account: store.getData(*account) if store is not None else None for account in accounts}
+        results = await asyncio.gather(*(self._crawlAccount(account, known[account], start_date, bucket, connections) for account in accounts),
+                                       return_exceptions=True)
+
+        # Failed accounts keep their checkpoint, crawling them again resumes where they stopped
+        self.errors = {account: result for account, result in zip(accounts, results) if isinstance(result, BaseException)}
+        scrapers = {account: result for account, result in zip(accounts, results) if not isinstance(result, BaseException)}
+
+        if store is not None:
+            for scraper in scrapers.values():
+                store.upsertScraper(scraper)
+
+        return scrapers
+
+    async def _crawlAccount(self, account, known_data, start_date, bucket: TokenBucket, connections: asyncio.Semaphore):
+        username, universe = account
+        scraper = StatsScraper(username, universe, start_date=start_date, known_data=known_data, link=self.link, crawl=False)
+        next_link, pages = self._restore(account, scraper) or (scraper.first_link, 0)
+
+        try:
+            while next_link is not None:
+                html = await self._fetch(next_link, bucket, connections)
+                more = await asyncio.to_thread(scraper.addPage, html)
+                next_link = self.fetcher.nextLink(html) if more else None
+                pages += 1
+
+                if next_link is not None and pages % self.checkpoint_pages == 0:
+                    await asyncio.to_thread(self._checkpoint, account, scraper, next_link, pages)
+        except BaseException:
+            # Failed or cancelled, the periodic checkpoints still cover a killed process
+            if pages:
+                self._checkpoint(account, scraper, next_link, pages)
+            raise
+
+        scraper.finish()
+        self._removeCheckpoint(account)
+        return scraper
+
+    async def _fetch(self, link: str, bucket: TokenBucket, connections: asyncio.Semaphore):
+        html = await asyncio.to_thread(self.fetcher.cached, link)
+        if html is not None:
+            return html
+
+        for attempt in range(self.retries + 1):
+            await bucket.acquire()
+
+            try:
+                async with connections:
+                    return await asyncio.to_thread(self.fetcher.request, link, self.timeout)
+            except PageError as e:
+                # Other client errors will not go away by asking again
+                if (e.status != 200 and e.status not in retry_statuses) or attempt == self.retries:
+                    raise
+
+                delay = e.retry_after
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+
+                delay = None
+
+            Instrumentation.count("scrape_retries")
+            await asyncio.sleep(delay if delay is not None else min(self.backoff_seconds * 2 ** attempt, self.max_backoff_seconds) * random.uniform(0.5, 1.5))
+
+    def _checkpointPath(self, account):
+        username, universe = account
+        return os.path.join(self.checkpoint_dir, f"{quote(username, safe='')}@{quote(universe, safe='')}")
+
+    def _checkpoint(self, account, scraper: StatsScraper, next_link: str, pages: int):
+        if self.checkpoint_dir is None:
+            return
+
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = self._checkpointPath(account)
+
+        # Both files are replaced atomically, the row count in the state file catches a crash between the two
+        LoadBinaryStats.write(f"{path}.bin.tmp", scraper.history)
+        os.replace(f"{path}.bin.tmp", f"{path}.bin")
+
+        with open(f"{path}.json.tmp", "w") as f:
+            # Only the query is kept, so a checkpoint survives a changed link such as another mirror
+            json.dump({"cursor": next_link[len(self.link):], "pages": pages, "rows": len(scraper.history)}, f)
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+
+    def _restore(self, account, scraper: StatsScraper):
+        if self.checkpoint_dir is None or not os.path.exists(f"{self._checkpointPath(account)}.json"):
+            return None
+
+        path = self._checkpointPath(account)
+
+        with open(f"{path}.json") as f:
+            state = json.load(f)
+
+        races = LoadBinaryStats(f"{path}.bin")
+        if races.rows != state["rows"]:
+            return None
+
+        # The checkpoint is in getData() order, the scraped history is newest first
+        scraper.history.extend(*(column[::-1] for column in races.getData()))
+        return self.link + state["cursor"], state["pages"]
+
+    def _removeCheckpoint(self, account):
+        if self.checkpoint_dir is None:
+            return
+
+        for extension in (".json", ".bin"):
+            path = self._checkpointPath(account) + extension
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,38 @@
+import os
+import sys
+
+
+def headless():
+    # No display to draw on, e.g. cron jobs, containers and ssh sessions
+    if sys.platform.startswith(("linux", "freebsd", "openbsd")):
+        return not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+    return False
+
+
+def selectBackend():
+    # Agg skips probing the GUI toolkits, MPLBACKEND or a backend chosen before pyplot was imported are kept
+    import matplotlib
+
+    if headless() and "MPLBACKEND" not in os.environ and "matplotlib.pyplot" not in sys.modules:
+        matplotlib.use("Agg")
+
+    return matplotlib
+
+
+def figure(**kwargs):
+    # matplotlib is only imported once something is drawn, so scraping and loading start without it
+    selectBackend()
+    from matplotlib.figure import Figure
+
+    return Figure(**kwargs)
+
+
+def colorbar(fig, ax, vmin: float, vmax: float, **kwargs):
+    from matplotlib.cm import ScalarMappable
+    from matplotlib.colors import Normalize
+
+    sm = ScalarMappable(cmap='RdYlGn', norm=Normalize(vmin=vmin, vmax=vmax))
+    sm.set_array([])
+
+    return fig.colorbar(sm, ax=ax, orientation='vertical', **kwargs)
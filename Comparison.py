@@ -0,0 +1,128 @@
+import numpy as np
+from AsyncCrawler import AsyncCrawler
+from Backend import figure
+from Downsampling import axesPixels, minMaxPerColumn
+
+alignments = ("attempt", "relative", "date")
+
+
+class Comparison:
+    def __init__(self, datasets: dict):
+        # datasets maps a name to the arrays returned by getData()
+        self.names = list(datasets)
+        self.data = [datasets[name] for name in self.names]
+        self.lengths = np.array([len(data[2]) for data in self.data])
+
+        self.wpm = self._pad(0)
+        self.accuracy = self._pad(1)
+
+    @classmethod
+    def fetch(cls, usernames, universe: str = "", store=None, max_workers: int = 8, max_requests_per_second: float = 5):
+        # Every account is crawled concurrently under one shared rate limit, with a store only newer races are fetched
+        crawler = AsyncCrawler(max_requests_per_second=max_requests_per_second, max_connections=max_workers)
+        scrapers = crawler.crawl([(username, universe) for username in usernames], store)
+
+        if crawler.errors:
+            raise next(iter(crawler.errors.values()))
+
+        return cls({username: scrapers[username, universe].getData() for username in dict.fromkeys(usernames)})
+
+    def _pad(self, column: int):
+        padded = np.full((len(self.data), max(self.lengths, default=0)), np.nan)
+
+        for row, data in enumerate(self.data):
+            padded[row, :len(data[column])] = data[column]
+
+        return padded
+
+    def runningAveragesOfN(self, values: np.ndarray, n: int):
+        # Same as RollingStats.runningAverageOfN for every account at once, positions past an account's length are nan
+        n = max(min(n, values.shape[1]), 1)
+        sums = np.concatenate((np.zeros((len(values), 1)), np.cumsum(np.nan_to_num(values), axis=1)), axis=1)
+
+        averages = np.empty_like(values)
+        averages[:, :n - 1] = sums[:, 1:n] / np.arange(1, n)
+        averages[:, n - 1:] = (sums[:, n:] - sums[:, :-n]) / n
+
+        # Accounts shorter than n only get the expanding average
+        short = self.lengths < n
+        averages[short] = sums[short, 1:] / np.arange(1, values.shape[1] + 1)
+
+        averages[np.arange(values.shape[1]) >= self.lengths[:, None]] = np.nan
+        return averages
+
+    def xValues(self, align: str = "attempt"):
+        if align == "attempt":
+            return [data[2] for data in self.data]
+        if align == "relative":
+            return [data[2] / len(data[2]) for data in self.data]
+        if align == "date":
+            return [np.asarray(data[5], dtype="datetime64[s]") for data in self.data]
+
+        raise ValueError(f"Unknown alignment: {align}, expected one of {alignments}")
+
+    def plot(self, average_grouping: int = 10, align: str = "attempt", path: str = "./img/comparisonAll.png"):
+        from matplotlib import colormaps
+
+        fig = figure(figsize=(10, 6))
+        ax = fig.subplots()
+
+        averages = self.runningAveragesOfN(self.wpm, average_grouping)
+        colors = colormaps["tab20" if len(self.names) <= 20 else "turbo"].resampled(max(len(self.names), 1))
+        columns = axesPixels(ax)[0]
+
+        for row, (name, x) in enumerate(zip(self.names, self.xValues(align))):
+            y = averages[row, :self.lengths[row]]
+            indices = minMaxPerColumn(np.asarray(x).astype(np.float64), y, columns)
+            ax.plot(x[indices], y[indices], color=colors(row), label=name, linewidth=1)
+
+        ax.set_title("Typing Speed")
+        ax.set_ylabel(f"Speed (WPM, average of {average_grouping})")
+        ax.set_xlabel({"attempt": "Amount of races", "relative": "Race percentage", "date": "Date"}[align])
+
+        ax.legend(fontsize="small", ncols=max(len(self.names) // 15, 1), loc="upper left", bbox_to_anchor=(1, 1))
+        fig.subplots_adjust(right=0.75)
+        fig.savefig(path)
+
+    def bestAveragesOfN(self, n: int):
+        # Best window of n races for every account, nan for accounts with fewer races
+        if n > self.wpm.shape[1]:
+            return np.full(len(self.wpm), np.nan)
+
+        sums = np.concatenate((np.zeros((len(self.wpm), 1)), np.cumsum(np.nan_to_num(self.wpm), axis=1)), axis=1)
+        windows = (sums[:, n:] - sums[:, :-n]) / n
+        windows[np.arange(windows.shape[1]) + n > self.lengths[:, None]] = -np.inf
+
+        best = windows.max(axis=1, initial=-np.inf)
+        return np.where(np.isfinite(best), best, np.nan)
+
+    def summary(self, ns=(10, 100)):
+        with np.errstate(all="ignore"):
+            columns = {
+                "name": self.names,
+                "races": self.lengths.tolist(),
+                "mean wpm": np.nanmean(self.wpm, axis=1),
+                "best wpm": np.nanmax(self.wpm, axis=1, initial=-np.inf),
+                "mean accuracy": np.nanmean(self.accuracy, axis=1),
+            }
+
+        for n in ns:
+            columns[f"best {n}"] = self.bestAveragesOfN(n)
+
+        rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+        return sorted(rows, key=lambda row: -row["mean wpm"])
+
+    def summaryTable(self, ns=(10, 100)):
+        rows = self.summary(ns)
+        if not rows:
+            return ""
+
+        header = list(rows[0])
+        cells = [[f"{value:.3f}" if isinstance(value, float) and key == "mean accuracy" else
+                  f"{value:.1f}" if isinstance(value, float) else str(value) for key, value in row.items()] for row in rows]
+        widths = [max(len(column), *(len(row[i]) for row in cells)) for i, column in enumerate(header)]
+
+        lines = ["  ".join(column.ljust(width) for column, width in zip(header, widths))]
+        lines += ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in cells]
+
+        return "\n".join(lines)
@@ -0,0 +1,308 @@
+import argparse
+import hashlib
+import json
+import os
+import traceback
+from collections import OrderedDict
+from contextlib import suppress
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Lock, Thread
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+from Aggregation import aggregate, periods
+from Downsampling import gridDeduplicate, minMaxPerColumn
+from RaceIndex import RaceIndex
+from RaceStore import RaceStore
+from RollingStats import RollingStats
+
+series_columns = ("wpm", "accuracy")
+page = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard", "live.html")
+
+
+class RequestError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _round(values, digits: int):
+    return np.round(np.asarray(values, dtype=float), digits).tolist()
+
+
+class DashboardServer:
+    def __init__(self, store_path: str = "races.sqlite", host: str = "127.0.0.1", port: int = 8050, max_responses: int = 512):
+        # One connection for every request thread, the lock keeps them from using it at the same time
+        self.store = RaceStore(store_path, check_same_thread=False)
+        self.max_responses = max_responses
+        self._store_lock = Lock()
+        self._lock = Lock()
+        self._accounts = {}
+        self._responses = OrderedDict()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.link = f"http://{host}:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def serve_forever(self):
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.store.close()
+
+    def _revision(self, username: str, universe: str):
+        # The last attempt only changes when new races arrive, which is all that invalidates an account's responses
+        with self._store_lock:
+            revision = self.store.lastAttempt(username, universe)
+
+        if revision is None:
+            raise RequestError(404, f"No races stored for {username} in universe '{universe}'")
+
+        return revision
+
+    def _account(self, username: str, universe: str, revision: int):
+        with self._lock:
+            account = self._accounts.get((username, universe))
+
+            if account is not None and account["revision"] == revision:
+                return account
+
+        with self._store_lock:
+            data = self.store.getData(username, universe)
+
+        account = {"revision": revision, "data": data, "index": RaceIndex(data),
+                   "stats": {name: RollingStats(column) for name, column in zip(("wpm", "accuracy"), data)}}
+
+        with self._lock:
+            self._accounts[username, universe] = account
+            for key in [key for key in self._responses if key[1:3] == (username, universe) and key[3] != revision]:
+                del self._responses[key]
+
+        return account
+
+    def _handle(self, request: BaseHTTPRequestHandler):
+        url = urlparse(request.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        try:
+            if url.path in ("/", "/index.html"):
+                with open(page, "rb") as f:
+                    return self._send(request, 200, "text/html; charset=utf-8", f.read())
+
+            if url.path == "/api/accounts":
+                with self._store_lock:
+                    accounts = self.store.accounts()
+                return self._send(request, 200, "application/json", json.dumps(accounts).encode())
+
+            endpoint = url.path.removeprefix("/api/")
+            if endpoint not in self.endpoints:
+                raise RequestError(404, f"Unknown endpoint {url.path}")
+
+            username = query.pop("user", None)
+            universe = query.pop("universe", "")
+            if not username:
+                raise RequestError(400, "Missing user parameter")
+
+            revision = self._revision(username, universe)
+            key = (endpoint, username, universe, revision, tuple(sorted(query.items())))
+
+            with self._lock:
+                cached = self._responses.get(key)
+                if cached is not None:
+                    self._responses.move_to_end(key)
+
+            if cached is None:
+                account = self._account(username, universe, revision)
+                content_type, body = self.endpoints[endpoint](self, account, **query)
+                cached = content_type, body, '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+                with self._lock:
+                    self._responses[key] = cached
+                    while len(self._responses) > self.max_responses:
+                        self._responses.popitem(last=False)
+
+            content_type, body, etag = cached
+            if request.headers.get("If-None-Match") == etag:
+                return self._send(request, 304, content_type, b"", etag)
+
+            self._send(request, 200, content_type, body, etag)
+        except RequestError as e:
+            self._send(request, e.status, "application/json", json.dumps({"error": str(e)}).encode())
+        except (TypeError, ValueError) as e:
+            self._send(request, 400, "application/json", json.dumps({"error": str(e)}).encode())
+        except Exception as e:
+            # e.g. a database or matplotlib failure, the client still gets a status line
+            traceback.print_exc()
+            with suppress(OSError):
+                self._send(request, 500, "application/json", json.dumps({"error": f"{type(e).__name__}: {e}"}).encode())
+
+    @staticmethod
+    def _send(request: BaseHTTPRequestHandler, status: int, content_type: str, body: bytes, etag: str = None):
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            request.send_header("ETag", etag)
+            request.send_header("Cache-Control", "no-cache")
+        request.end_headers()
+        request.wfile.write(body)
+
+    @staticmethod
+    def _json(payload: dict):
+        return "application/json", json.dumps(payload, separators=(",", ":")).encode()
+
+    @staticmethod
+    def _window(account: dict, start, end):
+        # Inclusive attempt range
+        return account["index"].attempts(int(start) if start not in (None, "") else None, int(end) if end not in (None, "") else None)
+
+    @staticmethod
+    def _column(name: str):
+        if name not in series_columns:
+            raise RequestError(400, f"Unknown series {name}, expected one of {series_columns}")
+
+        return series_columns.index(name)
+
+    def seriesData(self, account: dict, series: str = "wpm", average: str = "10", start: str = None, end: str = None, width: str = "1000"):
+        # Races, running average and PBs in the zoomed attempt range, at most about four points per pixel column
+        column = self._column(series)
+        values = account["data"][column]
+        attempt = account["data"][2]
+        window = self._window(account, start, end)
+        width = min(max(int(width), 1), 10000)
+        digits = 3 if series == "accuracy" else 1
+
+        x = attempt[window]
+        y = values[window]
+        averages = account["stats"][series].runningAverageOfN(int(average))[window] if len(values) else values[window]
+        points = minMaxPerColumn(x, y, width) if len(x) else np.array([], dtype=int)
+        average_points = minMaxPerColumn(x, averages, width) if len(x) else np.array([], dtype=int)
+
+        best = np.maximum.accumulate(values) if len(values) else values
+        pbs = np.flatnonzero(np.diff(best, prepend=-np.inf) > 0)
+        pbs = pbs[(pbs >= window.start) & (pbs < window.stop)]
+
+        return {
+            "series": series,
+            "rows": len(values),
+            "range": [int(x[0]), int(x[-1])] if len(x) else None,
+            "points": len(x),
+            "x": x[points].tolist(),
+            "y": _round(y[points], digits),
+            "average": {"n": int(average), "x": x[average_points].tolist(), "y": _round(averages[average_points], digits)},
+            "pb": {"x": attempt[pbs].tolist(), "y": _round(values[pbs], digits)},
+        }
+
+    def series(self, account: dict, **query):
+        return self._json(self.seriesData(account, **query))
+
+    def scatter(self, account: dict, x: str = "attempt", y: str = "wpm", start: str = None, end: str = None, width: str = "800", height: str = "600"):
+        # One point per occupied pixel cell, colored by the remaining column
+        names = ("wpm", "accuracy", "attempt")
+        if x not in names or y not in names or x == y:
+            raise RequestError(400, f"x and y have to be two different columns of {names}")
+
+        data = dict(zip(("wpm", "accuracy", "attempt"), account["data"][:3]))
+        window = self._window(account, start, end)
+        color = next(name for name in names if name not in (x, y))
+        columns = {name: column[window] for name, column in data.items()}
+
+        indices = gridDeduplicate(columns[x], columns[y], min(int(width), 4000), min(int(height), 4000)) if len(columns[x]) else []
+        return self._json({name: columns[name][indices].tolist() if name != "accuracy" else _round(columns[name][indices], 3)
+                           for name in (x, y, color)} | {"color": color})
+
+    def aggregates(self, account: dict, series: str = "wpm", period: str = "day", start: str = None, end: str = None):
+        if period not in periods:
+            raise RequestError(400, f"Unknown period {period}, expected one of {periods}")
+
+        window = self._window(account, start, end)
+        buckets = aggregate(account["data"][5][window], account["data"][self._column(series)][window], period)
+
+        return self._json({
+            "period": period,
+            "start": buckets.start.astype("datetime64[s]").astype(np.int64).tolist(),
+            "count": buckets.count.tolist(),
+            "min": _round(buckets.min, 3),
+            "max": _round(buckets.max, 3),
+            "mean": _round(buckets.mean, 3),
+        })
+
+    def histogram(self, account: dict, series: str = "wpm", bins: str = "50", start: str = None, end: str = None):
+        values = account["data"][self._column(series)][self._window(account, start, end)]
+        counts, edges = np.histogram(values, bins=min(max(int(bins), 1), 1000)) if len(values) else (np.array([]), np.array([]))
+
+        return self._json({"counts": counts.tolist(), "edges": _round(edges, 4)})
+
+    def summary(self, account: dict, ns: str = "10,25,50,100,1000"):
+        wpm, accuracy, attempt = account["data"][:3]
+        best = {}
+
+        ns = [n for n in map(int, ns.split(",")) if 0 < n <= len(wpm)]
+        for n, index, value in zip(ns, *account["stats"]["wpm"].bestAverageOfN(ns)):
+            best[n] = {"average": round(float(value), 2), "from": int(attempt[index]), "to": int(attempt[index + n - 1])}
+
+        return self._json({
+            "races": len(wpm),
+            "last attempt": account["revision"],
+            "mean wpm": round(float(wpm.mean()), 2) if len(wpm) else None,
+            "best wpm": int(wpm.max()) if len(wpm) else None,
+            "mean accuracy": round(float(accuracy.mean()), 4) if len(accuracy) else None,
+            "best averages": best,
+        })
+
+    def chart(self, account: dict, **query):
+        # Interactive version of the series, mpld3 is optional
+        try:
+            import mpld3
+        except ImportError:
+            raise RequestError(501, "Interactive charts need mpld3, pip install mpld3")
+
+        from Backend import figure
+
+        data = self.seriesData(account, **query)
+        fig = figure(figsize=(10, 5))
+        ax = fig.subplots()
+
+        ax.plot(data["x"], data["y"], linewidth=1, label=data["series"])
+        ax.plot(data["average"]["x"], data["average"]["y"], color="red", linewidth=1, label=f"Average of {data['average']['n']}")
+        ax.step(data["pb"]["x"], data["pb"]["y"], where="post", color="black", linestyle="--", linewidth=1, label="PB")
+        ax.set_xlabel("Amount of races")
+        ax.legend()
+
+        return "text/html; charset=utf-8", mpld3.fig_to_html(fig).encode()
+
+    endpoints = {"series": series, "scatter": scatter, "aggregates": aggregates, "histogram": histogram, "summary": summary, "chart": chart}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves the race histories of a RaceStore as JSON and interactive charts")
+    parser.add_argument("--store", default="races.sqlite")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    arguments = parser.parse_args()
+
+    server = DashboardServer(arguments.store, arguments.host, arguments.port)
+    print(f"Serving {arguments.store} on {server.link}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
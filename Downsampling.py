@@ -0,0 +1,52 @@
+import numpy as np
+
+
+def axesPixels(ax):
+    extent = ax.get_window_extent()
+    return max(int(extent.width), 1), max(int(extent.height), 1)
+
+
+def _cells(values, amount: int):
+    values = np.asarray(values, dtype=float)
+    low, high = values.min(), values.max()
+
+    if high == low:
+        return np.zeros(len(values), dtype=np.int64)
+
+    return np.minimum(((values - low) / (high - low) * amount).astype(np.int64), amount - 1)
+
+
+def minMaxPerColumn(x, y, columns: int):
+    # Indices of the first, last, lowest and highest point in every pixel column, x has to be sorted
+    if len(x) <= 4 * columns:
+        return np.arange(len(x))
+
+    column = _cells(x, columns)
+    starts = np.flatnonzero(np.diff(column, prepend=-1))
+    ends = np.append(starts[1:], len(x)) - 1
+
+    order = np.lexsort((y, column))
+    lowest = order[starts]
+    highest = order[ends]
+
+    return np.unique(np.concatenate((starts, ends, lowest, highest)))
+
+
+def gridDeduplicate(x, y, x_cells: int, y_cells: int):
+    # Index of the last point in every occupied grid cell, which is the one drawn on top of the others
+    cell = _cells(x, x_cells) * y_cells + _cells(y, y_cells)
+    _, indices = np.unique(cell[::-1], return_index=True)
+
+    return np.sort(len(cell) - 1 - indices)
+
+
+def spacedTicks(values, pixels: int, label_pixels: float = 14):
+    # Sorted values thinned to at most one per label height, the highest of every slot is kept
+    values = np.asarray(values)
+    slots = max(int(pixels // label_pixels), 1)
+
+    if len(values) <= 1:
+        return values
+
+    slot = _cells(values, slots)
+    return values[np.flatnonzero(np.diff(slot, append=slots))]
@@ -1,122 +1,262 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import wraps
+from inspect import Parameter, signature
 from math import floor
-import matplotlib.pyplot as plt
+from multiprocessing import shared_memory
 import numpy as np
-import matplotlib.colors as mcolors
 from typing import List
-from collections import Counter
-from AccuracyHistAnimator import AccuracyHistAnimator
+from Aggregation import aggregate
+from Backend import colorbar, figure, selectBackend
+from Downsampling import axesPixels, gridDeduplicate, minMaxPerColumn, spacedTicks
+import Instrumentation
+from RaceIndex import RaceIndex
+from RollingStats import RollingStats
+from RenderCache import RenderCache, cachedRender, restoreRender, fingerprint
+from StatsSnapshot import StatsSnapshot
+
+_worker_graph = None
+_worker_memory = []
+
+
+def _shareData(data):
+    # Object columns can not live in shared memory, so place and date become fixed width numpy types
+    wpm, accuracy, attempt, score, place, date = data
+    columns = [np.asarray(wpm), np.asarray(accuracy), np.asarray(attempt), np.asarray(score),
+               np.asarray(place, dtype=str), np.asarray(date, dtype="datetime64[us]")]
+
+    blocks = []
+    specs = []
+
+    for column in columns:
+        block = shared_memory.SharedMemory(create=True, size=max(column.nbytes, 1))
+        np.ndarray(column.shape, dtype=column.dtype, buffer=block.buf)[:] = column
+        blocks.append(block)
+        specs.append((block.name, column.shape, column.dtype.str))
+
+    return blocks, specs
+
+
+def _attachData(specs, render_cache, data_fingerprint, snapshot_directory):
+    global _worker_graph
+
+    # Workers only write files, whatever display the parent has
+    selectBackend()
+
+    data = []
+
+    for name, shape, dtype in specs:
+        block = shared_memory.SharedMemory(name=name)
+        _worker_memory.append(block)
+        data.append(np.ndarray(shape, dtype=dtype, buffer=block.buf))
+
+    _worker_graph = GraphMaker(data, render_cache, StatsSnapshot(snapshot_directory) if snapshot_directory is not None else None)
+    _worker_graph._fingerprint = data_fingerprint
+
+
+def windowed(method):
+    # Adds a window argument, a slice of rows (see RaceIndex), the chart is then drawn from views of just those rows
+    @wraps(method)
+    def wrapper(self, *args, window: slice = None, **kwargs):
+        return method(self.inWindow(window) if window is not None else self, *args, **kwargs)
+
+    parameters = list(signature(method).parameters.values())
+    wrapper.__signature__ = signature(method).replace(parameters=parameters + [Parameter("window", Parameter.KEYWORD_ONLY, default=None, annotation=slice)])
+    return wrapper
+
+
+def _renderChart(name, kwargs, instrumented):
+    metrics = Instrumentation.enable() if instrumented else None
+    getattr(_worker_graph, name)(**kwargs)
+    return metrics.toDict() if metrics is not None else None
 
 
 class GraphMaker:
-    def __init__(self, data: List[np.ndarray]):
+    charts = ("plotWPM", "plotAccuracy", "histDailyRaceAmounts", "plotWPMAccCorrelation", "plotAccWPMCorrelation",
+              "dailyProgress", "histWPM", "histAccuracy", "wpmAcc", "plotAccBins")
+    period_titles = {"day": "Daily", "week": "Weekly", "month": "Monthly"}
+    period_days = {"day": 1, "week": 7, "month": 30}
+
+    def __init__(self, data: List[np.ndarray], render_cache: RenderCache = None, snapshot: StatsSnapshot = None):
         self.wpm, self.accuracy, self.attempt, self.score, self.place, self.date = data
+        self.render_cache = render_cache
+
+        # Averages, PBs, buckets and histograms come from the snapshot instead of a pass over the races
+        if snapshot is not None and not snapshot.covers(self.attempt):
+            raise ValueError(f"The snapshot holds {snapshot.rows} races up to attempt {snapshot.last_attempt}, update it with this data first")
+
+        self.snapshot = snapshot
+        self._fingerprint = None
+        self._index = None
+        self._windows = {}
+        self._rolling_stats = {}
+        self._pb_series = None
 
+    def fingerprint(self):
+        if self._fingerprint is None:
+            self._fingerprint = fingerprint((self.wpm, self.accuracy, self.attempt, self.score, self.place, self.date))
+
+        return self._fingerprint
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = RaceIndex((self.wpm, self.accuracy, self.attempt, self.score, self.place, self.date))
+
+        return self._index
+
+    def inWindow(self, window: slice):
+        # Graph over views of the rows in window, kept for the next chart with the same window
+        key = (window.start, window.stop, window.step)
+
+        if key not in self._windows:
+            self._windows[key] = GraphMaker(self.index.view(window))
+
+        return self._windows[key]
+
+    def renderAll(self, charts: dict = None, processes: int = None):
+        # charts maps method names to their keyword arguments, every chart is drawn in its own worker process
+        # Workers may import the caller's script again, so scripts have to call this under if __name__ == "__main__"
+        if charts is None:
+            charts = {name: {} for name in self.charts}
+
+        pending = {name: kwargs for name, kwargs in charts.items() if not restoreRender(self, name, kwargs)}
+
+        if not pending:
+            return list(charts)
+
+        blocks, specs = _shareData((self.wpm, self.accuracy, self.attempt, self.score, self.place, self.date))
+
+        try:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_attachData,
+                                     initargs=(specs, self.render_cache, self.fingerprint() if self.render_cache else None,
+                                               self.snapshot.directory if self.snapshot is not None else None)) as pool:
+                futures = [pool.submit(_renderChart, name, kwargs, Instrumentation.active is not None) for name, kwargs in pending.items()]
+
+                for future in futures:
+                    metrics = future.result()
+
+                    if metrics is not None and Instrumentation.active is not None:
+                        Instrumentation.active.merge(metrics)
+
+                return list(charts)
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    @cachedRender("./img/WPM.png")
+    @windowed
     def plotWPM(self, pb_smooth_on: bool = True, pb_snap_on: bool = False, average_grouping: int = 10, average_on: bool = True):
-        plt.figure()
+        fig = figure()
+        ax = fig.subplots()
 
         if average_grouping > len(self.attempt):
             average_grouping = len(self.attempt)
 
-        plt.plot(self.attempt, self.wpm, label="Speed")
+        self._plotLine(ax, self.attempt, self.wpm, label="Speed")
 
-        plt.ylabel("Speed (WPM)")
-        plt.xlabel("Amount of races")
+        ax.set_ylabel("Speed (WPM)")
+        ax.set_xlabel("Amount of races")
 
         if pb_smooth_on:
-            self._pbGradual(self.wpm, label="PB Speeds (WPM)")
+            self._pbGradual(ax, self.wpm, label="PB Speeds (WPM)")
 
         if pb_snap_on:
-            self._pbSnap(self.wpm, label="PB Speeds (WPM)")
+            self._pbSnap(ax, self.wpm, label="PB Speeds (WPM)")
 
         if average_on:
-            self._plotAverage(self.wpm)
+            self._plotAverage(ax, self.wpm)
 
         if average_grouping > 0:
-            self._plotSmooth(self.wpm, self.attempt, average_grouping)
+            self._plotSmooth(ax, self.wpm, self.attempt, average_grouping)
 
-        plt.xlim(1, max(self.attempt))
-        plt.legend()
-        plt.title("Typing Speed")
+        ax.set_xlim(min(self.attempt), max(self.attempt))
+        ax.legend()
+        ax.set_title("Typing Speed")
 
-        plt.savefig("./img/WPM.png")
+        Instrumentation.savefig(fig, "./img/WPM.png")
 
+    @cachedRender("./img/histWPM.png")
+    @windowed
     def histWPM(self):
-        plt.figure()
+        fig = figure()
+        ax = fig.subplots()
 
-        bins = np.arange(min(self.wpm), max(self.wpm), 1)
-        plt.hist(self.wpm, bins=bins)
+        values, weights, least, most = self._distribution("wpm")
+        bins = np.arange(least, most, 1)
+        ax.hist(values, bins=bins, weights=weights)
 
-        plt.title("Typing test speed distribution")
-        plt.xlabel("Speed (WPM)")
-        plt.ylabel("Amount of races")
+        ax.set_title("Typing test speed distribution")
+        ax.set_xlabel("Speed (WPM)")
+        ax.set_ylabel("Amount of races")
 
-        plt.savefig("./img/histWPM.png")
+        Instrumentation.savefig(fig, "./img/histWPM.png")
 
+    @cachedRender("./img/Accuracy.png")
+    @windowed
     def plotAccuracy(self, average_grouping: int = 10, average_on: bool = True):
-        plt.figure()
+        fig = figure()
+        ax = fig.subplots()
 
         if average_grouping > len(self.attempt):
             average_grouping = len(self.attempt)
 
-        plt.plot(self.attempt, self.accuracy, label="Accuracy")
+        self._plotLine(ax, self.attempt, self.accuracy, label="Accuracy")
 
-        plt.ylabel("Accuracy")
-        plt.xlabel("Amount of races")
+        ax.set_ylabel("Accuracy")
+        ax.set_xlabel("Amount of races")
 
         if average_on:
-            self._plotAverage(self.accuracy)
+            self._plotAverage(ax, self.accuracy)
 
         if average_grouping > 0:
-            self._plotSmooth(self.accuracy, self.attempt, average_grouping=average_grouping)
+            self._plotSmooth(ax, self.accuracy, self.attempt, average_grouping=average_grouping)
 
-        plt.xlim(1, max(self.attempt))
-        plt.ylim(top=1)
-        plt.legend()
-        ax2 = plt.gca().secondary_yaxis('right')
+        ax.set_xlim(min(self.attempt), max(self.attempt))
+        ax.set_ylim(top=1)
+        ax.legend()
+        ax2 = ax.secondary_yaxis('right')
 
-        ax2.set_yticks(plt.yticks()[0])
-        plt.title("Typing Accuracy")
+        ax2.set_yticks(ax.get_yticks())
+        ax.set_title("Typing Accuracy")
 
-        plt.savefig("./img/Accuracy.png")
+        Instrumentation.savefig(fig, "./img/Accuracy.png")
 
+    @cachedRender("./img/AccWPM.png")
+    @windowed
     def plotAccWPMCorrelation(self):
-        plt.figure()
+        fig = figure()
+        ax = fig.subplots()
         slowest = min(self.wpm)
         fastest_rel = max(self.wpm)
-        fig, ax = plt.subplots()
 
         if len(self.attempt) > 6000:
             s = 1
         else:
             s = 20
 
-        if len(self.attempt) > 5e5:
-            att, acc, indices = self._removeOverlapping(self.attempt, self.accuracy, 1/100, 1000/1.01)  # TODO: make thresholds dynamic
+        indices = self._scatterIndices(ax, self.attempt, self.accuracy)
+        ax.scatter(self.attempt[indices], self.accuracy[indices], c=np.interp(self.wpm[indices], (slowest, fastest_rel), (0, 1)), cmap="RdYlGn", s=s)
 
-            plt.scatter(att, acc, c=np.interp(self.wpm[indices], (slowest, fastest_rel), (0, 1)), cmap="RdYlGn", s=s)
-        else:
-            plt.scatter(self.attempt, self.accuracy, c=np.interp(self.wpm, (slowest, fastest_rel), (0, 1)), cmap="RdYlGn", s=s)
-
-        plt.ylabel("Accuracy")
-        plt.xlabel("Amount of races")
+        ax.set_ylabel("Accuracy")
+        ax.set_xlabel("Amount of races")
 
-        plt.xlim(1, max(self.attempt))
-        plt.ylim(top=1)
-        ax2 = plt.gca().secondary_yaxis('right')
-        ax2.set_yticks(plt.yticks()[0])
+        ax.set_xlim(min(self.attempt), max(self.attempt))
+        ax.set_ylim(top=1)
+        ax2 = ax.secondary_yaxis('right')
+        ax2.set_yticks(ax.get_yticks())
 
-        norm = mcolors.Normalize(vmin=slowest, vmax=max(self.wpm))
-        sm = plt.cm.ScalarMappable(cmap='RdYlGn', norm=norm)
-        sm.set_array([])
+        colorbar(fig, ax, slowest, max(self.wpm), label='Speed', pad=0.1)
 
-        plt.colorbar(sm, ax=ax, orientation='vertical', label='Speed', pad=0.1)
+        ax.set_title("Typing Accuracy")
 
-        plt.title("Typing Accuracy")
-
-        plt.savefig("./img/AccWPM.png")
+        Instrumentation.savefig(fig, "./img/AccWPM.png")
 
+    @cachedRender("./img/WPMAcc.png")
+    @windowed
     def plotWPMAccCorrelation(self):
-        plt.figure()
+        fig = figure()
+        ax = fig.subplots()
         least = np.amin(self.accuracy)
         most = np.amax(self.accuracy)
 
@@ -125,25 +265,16 @@ class GraphMaker:
         else:
             s = 20
 
-        fig, ax = plt.subplots()
+        indices = self._scatterIndices(ax, self.attempt, self.wpm)
+        ax.scatter(self.attempt[indices], self.wpm[indices], c=np.interp(self.accuracy[indices], (least, most), (0, 1)), cmap="RdYlGn", s=s)
 
-        if len(self.attempt) > 5e5:
-            att, wpm, indices = self._removeOverlapping(self.attempt, self.wpm, 1 / 150, 1/3)  # TODO: make thresholds dynamic
+        ax.set_title("Typing Speed")
+        ax.set_ylabel("Speed (WPM)")
+        ax.set_xlabel("Amount of races")
 
-            plt.scatter(att, wpm, c=np.interp(self.accuracy[indices], (least, most), (0, 1)), cmap="RdYlGn", s=s)
-        else:
-            plt.scatter(self.attempt, self.wpm, c=np.interp(self.accuracy, (least, most), (0, 1)), cmap="RdYlGn", s=s)
+        colorbar(fig, ax, least, most, label='Accuracy')
 
-        plt.title("Typing Speed")
-        plt.ylabel("Speed (WPM)")
-        plt.xlabel("Amount of races")
-
-        norm = mcolors.Normalize(vmin=least, vmax=most)
-        sm = plt.cm.ScalarMappable(cmap='RdYlGn', norm=norm)
-        sm.set_array([])
-        plt.colorbar(sm, ax=ax, orientation='vertical', label='Accuracy')
-
-        plt.savefig("./img/WPMAcc.png")
+        Instrumentation.savefig(fig, "./img/WPMAcc.png")
 
     @staticmethod
     def _removeOverlapping(data_x, data_y, x_threshold, y_threshold):
@@ -158,82 +289,145 @@ class GraphMaker:
 
         return data_x, data_y, indices
 
+    @staticmethod
+    def _plotLine(ax, x, y, **kwargs):
+        # Keeps the extremes of every pixel column, so the drawn line looks the same with far fewer points
+        indices = minMaxPerColumn(x, y, axesPixels(ax)[0])
+        ax.plot(np.asarray(x)[indices], np.asarray(y)[indices], **kwargs)
+
+    @staticmethod
+    def _scatterIndices(ax, x, y):
+        return gridDeduplicate(x, y, *axesPixels(ax))
+
     @staticmethod
     def _average(data):
         return sum(map(lambda y: y[1], data))/len(data)
 
-    def _plotSmooth(self, data_source, attempts, average_grouping: int = 10, label=None, color="red"):
-        plt.plot(attempts, self._runningAverageOfN(data_source, average_grouping), color=color, label=label if label is not None else f"Average of {average_grouping}", linewidth=1)
+    def _plotSmooth(self, ax, data_source, attempts, average_grouping: int = 10, label=None, color="red"):
+        self._plotLine(ax, attempts, self._runningAverageOfN(data_source, average_grouping), color=color, label=label if label is not None else f"Average of {average_grouping}", linewidth=1)
 
     def _runningAverageOfN(self, arr, n):
-        return np.concatenate((self._runningAverage(arr[:n - 1]), np.convolve(arr, np.ones(n) / n, mode='valid')))
+        return self._rollingStats(arr).runningAverageOfN(n)
+
+    def _rollingStats(self, arr):
+        # The full wpm and accuracy columns keep their prefix sums, other series (e.g. cut off ones) get a fresh index
+        for name in ("wpm", "accuracy"):
+            if arr is getattr(self, name):
+                if name not in self._rolling_stats:
+                    self._rolling_stats[name] = self.snapshot.rollingStats(name, arr) if self.snapshot is not None else RollingStats(arr)
+
+                return self._rolling_stats[name]
+
+        return RollingStats(arr)
+
+    def _runningAverage(self, data):
+        return self._rollingStats(data).runningAverage()
+
+    def _plotAverage(self, ax, data):
+        self._plotLine(ax, self.attempt, self._runningAverage(data), color="lime", label="Average", linewidth=1)
+
+    def _buckets(self, period: str):
+        return self.snapshot.buckets("wpm", period) if self.snapshot is not None else aggregate(self.date, self.wpm, period)
+
+    def _distribution(self, name: str):
+        # (values, weights, minimum, maximum) to histogram, a snapshot gives one weighted value per whole wpm or accuracy percent
+        if self.snapshot is not None:
+            return self.snapshot.histogram(name)
+
+        values = getattr(self, name)
+        return values, None, min(values), max(values)
+
+    def _pbSeries(self, data_source):
+        # PB values and the index of the race that set each one, cached for the full wpm column
+        if data_source is self.wpm and self._pb_series is not None:
+            return self._pb_series
+
+        if data_source is self.wpm and self.snapshot is not None:
+            self._pb_series = self.snapshot.pbSeries("wpm")
+            return self._pb_series
+
+        best = np.maximum.accumulate(data_source)
+        index = np.flatnonzero(np.diff(best, prepend=-np.inf) > 0)
+        series = best[index], index
+
+        if data_source is self.wpm:
+            self._pb_series = series
+
+        return series
+
+    def _attemptFraction(self, attempts):
+        # Position along an x axis that spans the shown attempts, (a - 1) / (N - 1) for a full history starting at attempt 1
+        first, last = np.min(self.attempt), np.max(self.attempt)
+        return (attempts - first) / max(last - first, 1)
 
     @staticmethod
-    def _runningAverage(data):
-        return np.cumsum(data) / np.arange(1, len(data) + 1)
+    def _pbLines(ax, starts, pbs):
+        # One collection instead of an axhline per PB, x runs in axes coordinates like axhline's xmin
+        from matplotlib.collections import LineCollection
 
-    def _plotAverage(self, data):
-        plt.plot(self.attempt, self._runningAverage(data), color="lime", label="Average", linewidth=1)
+        segments = np.stack((np.column_stack((starts, pbs)), np.column_stack((np.ones(len(pbs)), pbs))), axis=1)
+        ax.add_collection(LineCollection(segments, colors="black", linestyles="--", linewidths=1, transform=ax.get_yaxis_transform()), autolim=False)
 
-    def _pbGradual(self, data_source, label: str = "PB"):
-        zipped = np.column_stack((np.maximum.accumulate(data_source), self.attempt))
-        unique, index = np.unique(zipped[:, 0], axis=0, return_index=True)
+    def _pbGradual(self, ax, data_source, label: str = "PB"):
+        unique, index = self._pbSeries(data_source)
 
         pb_attempts = self.attempt[index]
-        plt.plot(pb_attempts, unique, color="black", label="PB's", linewidth=1)
-
-        total_attempts = len(self.attempt)
+        ax.plot(pb_attempts, unique, color="black", label="PB's", linewidth=1)
 
-        for attempt, pb in zip(pb_attempts, unique):
-            plt.axhline(y=pb, color="black", linestyle="--", linewidth=1, xmin=attempt / total_attempts)
+        self._pbLines(ax, self._attemptFraction(pb_attempts), unique)
 
-        ax2 = plt.gca().secondary_yaxis('right')
-        ax2.set_yticks(unique)
-        plt.subplots_adjust(right=0.85)
+        ax2 = ax.secondary_yaxis('right')
+        ax2.set_yticks(spacedTicks(unique, axesPixels(ax)[1]))
+        ax.figure.subplots_adjust(right=0.85)
         ax2.set_ylabel(label, rotation=270, labelpad=10, ha='center', va='center_baseline',
                        multialignment='center')
 
-    def _pbSnap(self, data_source, label: str = "PB"):
-        zipped = np.column_stack((np.maximum.accumulate(data_source), self.attempt))
-        unique, index = np.unique(zipped[:, 0], axis=0, return_index=True)
+    def _pbSnap(self, ax, data_source, label: str = "PB"):
+        unique, index = self._pbSeries(data_source)
 
         double = np.repeat(unique, 2)
         index_repeat = np.concatenate(([index[0]], np.repeat(index[1:], 2), [index[-1]]))
         pb_attempts = self.attempt[index_repeat]
 
-        plt.plot(pb_attempts, double, color="black", label="PB's", linewidth=1)
+        ax.plot(pb_attempts, double, color="black", label="PB's", linewidth=1)
 
         unique_indices = self.attempt[index][1:]
 
-        for attempt, pb in zip(np.append(unique_indices, unique_indices[-1]), unique):
-            plt.axhline(y=pb, color="black", linestyle="--", linewidth=1, xmin=attempt / len(self.attempt))
+        self._pbLines(ax, self._attemptFraction(np.append(unique_indices, unique_indices[-1])), unique)
 
-        ax2 = plt.gca().secondary_yaxis('right')
-        ax2.set_yticks(unique)
-        plt.subplots_adjust(right=0.85)
+        ax2 = ax.secondary_yaxis('right')
+        ax2.set_yticks(spacedTicks(unique, axesPixels(ax)[1]))
+        ax.figure.subplots_adjust(right=0.85)
         ax2.set_ylabel(label, rotation=270, labelpad=10, ha='center', va='center_baseline',
                        multialignment='center')
 
+    @cachedRender("./img/histAcc.png")
+    @windowed
     def histAccuracy(self):
-        plt.figure()
+        fig = figure()
+        ax = fig.subplots()
 
-        bins = np.floor(np.arange(floor(min(self.accuracy) * 100) / 100, 1.011, 0.01) * 100) / 100
+        values, weights, least, _ = self._distribution("accuracy")
+        bins = np.floor(np.arange(floor(least * 100) / 100, 1.011, 0.01) * 100) / 100
         np.set_printoptions(precision=15)
-        plt.hist(self.accuracy, bins=bins)
+        ax.hist(values, bins=bins, weights=weights)
 
         bins = np.delete(bins, np.argwhere(bins > 1.005))
-        plt.title("Typing test accuracy distribution")
-        plt.xlabel("Accuracy (%)")
-        plt.ylabel("Amount of races")
+        ax.set_title("Typing test accuracy distribution")
+        ax.set_xlabel("Accuracy (%)")
+        ax.set_ylabel("Amount of races")
 
         xticks = bins[::len(bins) // 10 if len(bins) > 10 else 1]
 
-        plt.xticks(xticks + 0.005, [f"{round(100*value)}" for value in xticks])
-        plt.subplots_adjust(left=0.15)
-        plt.savefig("./img/histAcc.png")
+        ax.set_xticks(xticks + 0.005, [f"{round(100*value)}" for value in xticks])
+        fig.subplots_adjust(left=0.15)
+        Instrumentation.savefig(fig, "./img/histAcc.png")
 
+    @cachedRender("./img/wpmAccRace.png")
+    @windowed
     def wpmAcc(self):
-        plt.figure()
+        fig = figure()
+        ax = fig.subplots()
         least = min(self.attempt)
         most = max(self.attempt)
 
@@ -242,167 +436,176 @@ class GraphMaker:
         else:
             s = 20
 
-        fig, ax = plt.subplots()
-
         acc, wpm, indices = self._removeOverlapping(self.accuracy[::-1], self.wpm[::-1], 1000, 1)
         indices = len(self.attempt) - indices - 1
-        plt.scatter(acc, wpm, c=np.interp(self.attempt[indices], (least, most), (0, 1)), cmap="RdYlGn", s=s)
-
-        plt.title("Speed/Accuracy")
-        plt.ylabel("Speed (WPM)")
-        plt.xlabel("Accuracy")
-
-        norm = mcolors.Normalize(vmin=least, vmax=most)
-        sm = plt.cm.ScalarMappable(cmap='RdYlGn', norm=norm)
-        sm.set_array([])
-        plt.colorbar(sm, ax=ax, orientation='vertical', label='Amount of races')
-
-        plt.savefig("./img/wpmAccRace.png")
-
-    def histDailyRaceAmounts(self):
-        plt.figure()
-
-        plt.bar(*zip(*Counter(self.date).items()), width=1)  # Faster than numpy only
-
-        plt.title("Total races per day")
-        plt.ylabel("Races")
-        plt.xlabel("Time (days)")
-
-        plt.xticks(rotation=-90)
-        plt.subplots_adjust(bottom=0.2)
-
-        plt.savefig("./img/DailyRaceAmounts.png")
-
-    def dailyProgress(self):
-        plt.figure()
-
-        last_date = self.date[0].date()
-        best = self.wpm[0]
-        worst = self.wpm[0]
-        total = 0
-        amount = 0
-        bests = []
-        worsts = []
-        averages = []
-        dates = [self.date[0].date()]
-
-        for i, date in enumerate(self.date):
-            date = date.date()
-            wpm = self.wpm[i]
-            if date == last_date:
-                total += wpm
-                amount += 1
-
-                if wpm > best:
-                    best = wpm
-                elif wpm < worst:
-                    worst = worst
-            else:
-                last_date = date
-
-                bests.append(best)
-                worsts.append(worst)
-                averages.append(total/amount)
-                dates.append(date)
-
-                total = wpm
-                amount = 1
-                best = wpm
-                worst = wpm
-
-        bests.append(best)
-        worsts.append(worst)
-        averages.append(total / amount)
+        ax.scatter(acc, wpm, c=np.interp(self.attempt[indices], (least, most), (0, 1)), cmap="RdYlGn", s=s)
+
+        ax.set_title("Speed/Accuracy")
+        ax.set_ylabel("Speed (WPM)")
+        ax.set_xlabel("Accuracy")
+
+        colorbar(fig, ax, least, most, label='Amount of races')
+
+        Instrumentation.savefig(fig, "./img/wpmAccRace.png")
+
+    @cachedRender("./img/DailyRaceAmounts.png")
+    @windowed
+    def histDailyRaceAmounts(self, period: str = "day"):
+        fig = figure()
+        ax = fig.subplots()
+
+        buckets = self._buckets(period)
+        ax.bar(buckets.start, buckets.count, width=self.period_days[period])
+
+        ax.set_title(f"Total races per {period}")
+        ax.set_ylabel("Races")
+        ax.set_xlabel(f"Time ({period}s)")
+
+        ax.tick_params(axis="x", labelrotation=-90)
+        fig.subplots_adjust(bottom=0.2)
+
+        Instrumentation.savefig(fig, "./img/DailyRaceAmounts.png")
+
+    @cachedRender("./img/DailyRaces.png")
+    @windowed
+    def dailyProgress(self, period: str = "day"):
+        fig = figure()
+        ax = fig.subplots()
+
+        buckets = self._buckets(period)
+        dates = buckets.start
 
         s = 10 if len(dates) < 150 else 5
 
-        plt.scatter(dates, bests, color="lime", label="Best", s=s)
-        plt.scatter(dates, worsts, color="red", label="Worst", s=s)
-        plt.scatter(dates, averages, color="blue", label="Average", s=s)
+        ax.scatter(dates, buckets.max, color="lime", label="Best", s=s)
+        ax.scatter(dates, buckets.min, color="red", label="Worst", s=s)
+        ax.scatter(dates, buckets.mean, color="blue", label="Average", s=s)
 
-        plt.title("Daily Races")
-        plt.xlabel("Time (days)")
-        plt.ylabel("Speed (WPM)")
-        plt.legend()
+        ax.set_title(f"{self.period_titles[period]} Races")
+        ax.set_xlabel(f"Time ({period}s)")
+        ax.set_ylabel("Speed (WPM)")
+        ax.legend()
 
-        plt.xticks(rotation=-90)
-        plt.subplots_adjust(bottom=0.3)
+        ax.tick_params(axis="x", labelrotation=-90)
+        fig.subplots_adjust(bottom=0.3)
 
-        plt.savefig("./img/DailyRaces.png")
+        Instrumentation.savefig(fig, "./img/DailyRaces.png")
 
+    @cachedRender("./img/AccBins.png")
+    @windowed
     def plotAccBins(self, min_acc=0):
-        plt.figure()
+        fig = figure()
+        ax = fig.subplots()
+
+        bins, attempts, codes = self._accuracyBinCodes(min_acc)
+        rows_by_bin = np.split(np.argsort(codes, kind="stable"), np.cumsum(np.bincount(codes, minlength=len(bins)))[:-1])
+
+        for code in range(len(bins) - 1, -1, -1):
+            # At the k-th race of a bin, k races so far fell in that bin
+            rows = rows_by_bin[code]
+            x = np.append(attempts[rows], max(self.attempt))
+            y = np.append(np.arange(1, len(rows) + 1), len(rows)) / x
 
-        bins = {}
-        data = sorted(zip(self.attempt, np.floor(self.accuracy * 100) / 100), key=lambda x: x[0])
+            self._plotLine(ax, x, y * 100, label=f"{100 * bins[code]:.0f}%")
 
-        for i, acc in data:
-            if acc in bins:
-                bins[acc].append(i)
-            elif acc >= min_acc:
-                bins[acc] = [i]
+        ax.set_title("Accuracies Progression")
+        ax.set_xlabel("Total amount of races")
+        ax.set_ylabel("Accuracy distribution (%)")
+        ax.legend()
+        Instrumentation.savefig(fig, "./img/AccBins.png")
 
-        for key, values in sorted(bins.items(), key=lambda x: -x[0]):
-            x = values
-            vals = np.array(range(1, len(x) + 1))
-            y = vals / values
+    def accuracyBinMatrix(self, min_acc=0):
+        # Row i holds, per accuracy bin, how many of the races up to attempts[i] fell in that bin
+        bins, attempts, codes = self._accuracyBinCodes(min_acc)
+        counts = np.empty((len(codes), len(bins)), dtype=np.uint32)
 
-            x = np.append(x, max(self.attempt))
-            y = np.append(y, vals[-1] / x[-1])
+        for start, block in self.accuracyBinBlocks(bins, codes):
+            counts[start:start + len(block)] = block
 
-            plt.plot(x, y * 100, label=f"{100 * key:.0f}%")
+        return bins, attempts, counts
 
-        plt.title("Accuracies Progression")
-        plt.xlabel("Total amount of races")
-        plt.ylabel("Accuracy distribution (%)")
-        plt.legend()
-        plt.savefig("./img/AccBins.png")
+    def _accuracyBinCodes(self, min_acc):
+        order = np.argsort(self.attempt, kind="stable")
+        attempts = self.attempt[order]
+        accuracies = np.floor(self.accuracy[order] * 100) / 100
 
+        kept = accuracies >= min_acc
+        bins, codes = np.unique(accuracies[kept], return_inverse=True)
+
+        return bins, attempts[kept], codes
+
+    @staticmethod
+    def accuracyBinBlocks(bins, codes, block: int = 65536):
+        # (first row, rows of the matrix above) for every block of rows, only one block and the running totals are kept
+        totals = np.zeros(len(bins), dtype=np.uint32)
+
+        for start in range(0, len(codes), block):
+            rows = codes[start:start + block]
+            counts = np.bincount(np.arange(len(rows)) * len(bins) + rows, minlength=len(rows) * len(bins)).astype(np.uint32)
+            counts = np.cumsum(counts.reshape(len(rows), len(bins)), axis=0, out=counts.reshape(len(rows), len(bins)))
+            counts += totals
+            totals = counts[-1].copy()
+            yield start, counts
+
+    @cachedRender("./img/comparison.png")
+    @windowed
     def overlapWPM(self, other, average_grouping: int = 10, relative=False, cutoff=False, self_name: str = "Self", other_name: str = "Other"):
-        plt.figure()
+        fig = figure()
+        ax = fig.subplots()
 
         self_wpm = self.wpm
         other_wpm = other.wpm
 
         if relative:
-            plt.xlim(0, 1)
-            plt.xlabel("Race percentage")
+            ax.set_xlim(0, 1)
+            ax.set_xlabel("Race percentage")
             self_attempts = self.attempt/len(self.attempt)
             other_attempts = other.attempt/len(other.attempt)
         elif cutoff:
-            plt.xlim(1, min(len(self.attempt), len(other.attempt)))
-            plt.xlabel("Amount of races")
+            ax.set_xlim(1, min(len(self.attempt), len(other.attempt)))
+            ax.set_xlabel("Amount of races")
             min_attempts = min(len(self.attempt), len(other.attempt))
             self_wpm = self.wpm[:min_attempts]
             self_attempts = self.attempt[:min_attempts]
             other_wpm = other.wpm[:min_attempts]
             other_attempts = other.attempt[:min_attempts]
         else:
-            plt.xlim(1, max(np.append(self.attempt, other.attempt)))
-            plt.xlabel("Amount of races")
+            ax.set_xlim(1, max(np.append(self.attempt, other.attempt)))
+            ax.set_xlabel("Amount of races")
             self_attempts = self.attempt
             other_attempts = other.attempt
 
-        self._plotSmooth(self_wpm, self_attempts, average_grouping=average_grouping, label=self_name, color="red")
-        self._plotSmooth(other_wpm, other_attempts, average_grouping=average_grouping, label=other_name, color="blue")
+        self._plotSmooth(ax, self_wpm, self_attempts, average_grouping=average_grouping, label=self_name, color="red")
+        self._plotSmooth(ax, other_wpm, other_attempts, average_grouping=average_grouping, label=other_name, color="blue")
 
-        plt.ylabel("Speed (WPM)")
+        ax.set_ylabel("Speed (WPM)")
 
-        plt.legend()
-        plt.title("Typing Speed")
+        ax.legend()
+        ax.set_title("Typing Speed")
 
-        plt.savefig("./img/comparison.png")
+        Instrumentation.savefig(fig, "./img/comparison.png")
 
     def getMaxAverageOfN(self, n: int = 10):
-        races = np.convolve(self.accuracy, np.ones(n) / n)
-        index = np.argmax(np.convolve(self.accuracy, np.ones(n) / n)) - n + 1
-        return index, races[index + n - 1]
-
-    def animateHistAccuracy(self, frame_step_size=None, duration_seconds=3):
+        indices, averages = self._rollingStats(self.accuracy).bestAverageOfN(n)
+        return indices[0], averages[0]
+
+    def getBestAveragesOfN(self, ns=(10, 25, 50, 100, 1000), data: str = "wpm"):
+        # Start index and average of the best window of every size in ns, sizes longer than the history are skipped
+        stats = self._rollingStats(getattr(self, data))
+        return stats.bestAverageOfN([n for n in ns if n <= len(stats)])
+
+    @cachedRender("./img/histAccuracy.gif")
+    @windowed
+    def animateHistAccuracy(self, frame_step_size=None, duration_seconds=3, spacing: str = "linear", processes: int = None, optimize: bool = False):
+        from AccuracyHistAnimator import AccuracyHistAnimator
         animator = AccuracyHistAnimator(self.accuracy)
-        animator.save_animation('./img/histAccuracy.gif', frame_step_size=frame_step_size, duration_seconds=duration_seconds)
+        animator.save_animation('./img/histAccuracy.gif', frame_step_size=frame_step_size, duration_seconds=duration_seconds, spacing=spacing,
+                                processes=processes, optimize=optimize)
 
-    def animateHistWPM(self, frame_step_size=None, duration_seconds=3):
+    @cachedRender("./img/histWPM.gif")
+    @windowed
+    def animateHistWPM(self, frame_step_size=None, duration_seconds=3, spacing: str = "linear", processes: int = None, optimize: bool = False):
         from WPMHistAnimator import WPMHistAnimator
         animator = WPMHistAnimator(self.wpm)
-        animator.save_animation('./img/histWPM.gif', frame_step_size=frame_step_size, duration_seconds=duration_seconds)
+        animator.save_animation('./img/histWPM.gif', frame_step_size=frame_step_size, duration_seconds=duration_seconds, spacing=spacing,
+                                processes=processes, optimize=optimize)
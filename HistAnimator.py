@@ -0,0 +1,161 @@
+import os
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from PIL import Image
+from AnimationEncoders import FfmpegEncoder, GifEncoder, formats
+from Backend import figure
+
+_worker_frames = None
+
+
+class FrameRasterizer:
+    # Draws frames of a histogram figure, the bars are the only patches of its axes
+    def __init__(self, fig, mode: str, palette=None):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.canvas = FigureCanvasAgg(fig)
+        self.bars = fig.axes[0].patches
+        self.mode = mode
+        self.palette = None
+
+        if palette is not None:
+            self.palette = Image.new("P", (1, 1))
+            self.palette.putpalette(palette)
+
+    def image(self, heights):
+        for bar, height in zip(self.bars, heights):
+            bar.set_height(height)
+
+        self.canvas.draw()
+        image = Image.fromarray(np.asarray(self.canvas.buffer_rgba())).convert("RGB")
+
+        # Every frame is mapped onto the same palette, so the gif needs only one color table
+        return image.quantize(palette=self.palette, dither=Image.Dither.NONE) if self.mode == "P" else image
+
+    def frames(self, counts):
+        return [self.image(heights).tobytes() for heights in counts]
+
+
+def _initWorker(fig_bytes, mode, palette):
+    global _worker_frames
+    _worker_frames = FrameRasterizer(pickle.loads(fig_bytes), mode, palette)
+
+
+def _renderFrames(counts):
+    return _worker_frames.frames(counts)
+
+
+class HistAnimator:
+    def __init__(self, values, bins):
+        self.values = values
+        self.bins = bins
+        self.fig = figure()
+        self.ax = self.fig.subplots()
+        self.counts = None
+
+        self.bars = self.ax.bar(self.bins[:-1], np.zeros(len(self.bins) - 1), width=np.diff(self.bins), align="edge", color="blue")
+
+    def frameEnds(self, frame_step_size: int, spacing: str = "linear"):
+        # Amount of races shown in every frame, "log" spends more frames on the start of the history
+        # The last frame always shows the full history, a step longer than the history gives just that frame
+        races = len(self.values)
+        if not races:
+            raise ValueError("There are no races to animate")
+
+        if spacing not in ("linear", "log"):
+            raise ValueError(f"Unknown frame spacing: {spacing}")
+
+        frames = races // frame_step_size
+        if frames <= 1:
+            return np.array([races])
+
+        if spacing == "linear":
+            ends = np.arange(frames) * frame_step_size + 1
+            return ends if ends[-1] == races else np.append(ends, races)
+
+        # Rounding down repeats the small "log" ends, every frame has to add races
+        return np.unique(np.append(np.geomspace(1, races, frames).astype(int), races))
+
+    def cumulativeCounts(self, ends):
+        # Histogram of every prefix values[:end], built from one pass over the data instead of one per frame
+        values = np.asarray(self.values)
+        bin_index = np.searchsorted(self.bins, values, side="right") - 1
+        bin_index[values == self.bins[-1]] = len(self.bins) - 2
+        bins = len(self.bins) - 1
+
+        in_range = (bin_index >= 0) & (bin_index < bins)
+        first_frame = np.searchsorted(ends, np.arange(1, len(values) + 1), side="left")
+        in_range &= first_frame < len(ends)
+
+        counts = np.bincount(first_frame[in_range] * bins + bin_index[in_range], minlength=len(ends) * bins)
+        return np.cumsum(counts.reshape(len(ends), bins), axis=0)
+
+    def _frames(self, mode: str, palette, processes: int, chunk_size: int):
+        # Frames in order, at most two chunks per worker are in flight so memory does not grow with the frame count
+        chunks = (self.counts[start:start + chunk_size] for start in range(0, len(self.counts), chunk_size))
+
+        if processes == 1:
+            rasterizer = FrameRasterizer(self.fig, mode, palette)
+            for chunk in chunks:
+                yield from rasterizer.frames(chunk)
+            return
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=_initWorker, initargs=(pickle.dumps(self.fig), mode, palette)) as pool:
+            pending = deque()
+
+            for chunk in chunks:
+                pending.append(pool.submit(_renderFrames, chunk))
+
+                if len(pending) >= 2 * processes:
+                    yield from pending.popleft().result()
+
+            while pending:
+                yield from pending.popleft().result()
+
+    def save_animation(self, filename, frame_step_size=None, duration_seconds=3, spacing: str = "linear", processes: int = None,
+                       optimize: bool = False, chunk_size: int = 16):
+        # The output format follows the extension, optimize shrinks the gif palette to 32 colors
+        extension = os.path.splitext(filename)[1].lower()
+        if extension not in formats:
+            raise ValueError(f"Unknown animation format: {extension}, expected one of {formats}")
+
+        if frame_step_size is None:
+            frame_step_size = len(self.values) // 36
+
+        if frame_step_size == 0:
+            frame_step_size = 1
+
+        self.counts = self.cumulativeCounts(self.frameEnds(frame_step_size, spacing))
+        max_frames = len(self.counts)
+        fps = max(max_frames // duration_seconds, 1)
+
+        # The y-axis is fixed to the final histogram so only the bars change between frames
+        self.ax.set_ylim(0, max(self.counts[-1].max(), 1) * 1.05)
+
+        # Starting workers only pays off once every one of them gets a few chunks
+        if processes is None:
+            processes = min(os.cpu_count() or 1, max_frames // (2 * chunk_size)) or 1
+
+        # The final frame has every color the others use
+        final = FrameRasterizer(self.fig, "RGB").image(self.counts[-1])
+        size = final.size
+        palette = None
+
+        if extension == ".gif":
+            palette = final.quantize(colors=32 if optimize else 256, dither=Image.Dither.NONE).getpalette()
+            encoder = GifEncoder(filename, fps)
+        else:
+            encoder = FfmpegEncoder(filename, fps, size, extension)
+
+        try:
+            for frame in self._frames(encoder.mode, palette, processes, chunk_size):
+                image = Image.frombytes(encoder.mode, size, frame)
+
+                if palette is not None:
+                    image.putpalette(palette)
+
+                encoder.write(image)
+        finally:
+            encoder.close()
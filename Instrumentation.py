@@ -0,0 +1,139 @@
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from threading import Lock
+
+prefix = "typeracer_"
+active = None
+_chart = ContextVar("chart", default=None)
+
+
+class Instrumentation:
+    def __init__(self):
+        self.counters = defaultdict(float)
+        self.timers = defaultdict(lambda: [0, 0.0])
+        self.started = time.time()
+        self._lock = Lock()
+
+    def count(self, name: str, amount: float = 1, **labels):
+        with self._lock:
+            self.counters[name, tuple(sorted(labels.items()))] += amount
+
+    def observe(self, name: str, seconds: float, **labels):
+        with self._lock:
+            timer = self.timers[name, tuple(sorted(labels.items()))]
+            timer[0] += 1
+            timer[1] += seconds
+
+    @contextmanager
+    def time(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def toDict(self):
+        with self._lock:
+            return {
+                "started": self.started,
+                "timestamp": time.time(),
+                "counters": [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in self.counters.items()],
+                "timers": [{"name": name, "labels": dict(labels), "count": count, "seconds": seconds}
+                           for (name, labels), (count, seconds) in self.timers.items()],
+            }
+
+    def merge(self, other: dict):
+        # Adds the toDict() export of another process, e.g. a GraphMaker.renderAll worker
+        for counter in other["counters"]:
+            self.count(counter["name"], counter["value"], **counter["labels"])
+
+        with self._lock:
+            for other_timer in other["timers"]:
+                timer = self.timers[other_timer["name"], tuple(sorted(other_timer["labels"].items()))]
+                timer[0] += other_timer["count"]
+                timer[1] += other_timer["seconds"]
+
+    def toPrometheus(self):
+        def labelText(labels):
+            escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+            return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}" if labels else ""
+
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {prefix}{name}_total counter")
+                lines += [f"{prefix}{name}_total{labelText(labels)} {value:g}" for (key, labels), value in self.counters.items() if key == name]
+
+            for name in sorted({name for name, _ in self.timers}):
+                lines.append(f"# TYPE {prefix}{name} summary")
+                for (key, labels), (count, seconds) in self.timers.items():
+                    if key == name:
+                        lines.append(f"{prefix}{name}_sum{labelText(labels)} {seconds:.6f}")
+                        lines.append(f"{prefix}{name}_count{labelText(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def writeLog(self, path: str):
+        # Appends one JSON object per line, one line per run
+        with open(path, "a") as f:
+            f.write(json.dumps(self.toDict()) + "\n")
+
+    def writePrometheus(self, path: str):
+        # Written to a temporary file first so a textfile collector never reads half a file
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            f.write(self.toPrometheus())
+        os.replace(temporary, path)
+
+
+def enable():
+    global active
+    active = Instrumentation()
+    return active
+
+
+def disable():
+    global active
+    active = None
+
+
+def count(name: str, amount: float = 1, **labels):
+    if active is not None:
+        active.count(name, amount, **labels)
+
+
+def timer(name: str, **labels):
+    return active.time(name, **labels) if active is not None else nullcontext()
+
+
+@contextmanager
+def chart(name: str):
+    # Splits the time of one chart into compute and savefig, savefig() adds to the chart that is being drawn
+    if active is None:
+        yield
+        return
+
+    token = _chart.set([0.0])
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        saving = _chart.get()[0]
+        _chart.reset(token)
+
+        active.observe("chart_compute_seconds", time.perf_counter() - start - saving, chart=name)
+        active.observe("chart_savefig_seconds", saving, chart=name)
+
+
+def savefig(fig, path: str):
+    start = time.perf_counter()
+    fig.savefig(path)
+
+    current = _chart.get()
+    if current is not None:
+        current[0] += time.perf_counter() - start
@@ -0,0 +1,80 @@
+import json
+import struct
+import numpy as np
+
+magic = b"TRSTATS\0"
+version = 1
+alignment = 64
+columns = [("wpm", "<i4"), ("accuracy", "<f8"), ("attempt", "<i4"), ("score", "<i4"), ("place", "<u2"), ("date", "<i8")]
+
+
+def _align(offset: int):
+    return -(-offset // alignment) * alignment
+
+
+class LoadBinaryStats:
+    def __init__(self, filename: str):
+        with open(filename, "rb") as file:
+            if file.read(len(magic)) != magic:
+                raise ValueError(f"{filename} is not a race stats file")
+
+            header_size, = struct.unpack("<I", file.read(4))
+            self.header = json.loads(file.read(header_size))
+            data_start = _align(file.tell())
+
+        if self.header["version"] != version:
+            raise ValueError(f"Unsupported race stats file version {self.header['version']}")
+
+        self.rows = self.header["rows"]
+        self.places = np.array(self.header["places"])
+        self._buffer = np.memmap(filename, dtype=np.uint8, mode="r")
+        self._columns = {}
+
+        for name, dtype, offset in self.header["columns"]:
+            nbytes = self.rows * np.dtype(dtype).itemsize
+            self._columns[name] = self._buffer[data_start + offset:data_start + offset + nbytes].view(dtype)
+
+        self.wpm = self._columns["wpm"]
+        self.accuracy = self._columns["accuracy"]
+        self.attempt = self._columns["attempt"]
+        self.score = self._columns["score"]
+        self.place = self.places[self._columns["place"]] if len(self.places) else np.array([], dtype=str)
+        self.date = self._columns["date"].view("datetime64[s]")
+
+    def getData(self):
+        return [self.wpm, self.accuracy, self.attempt, self.score, self.place, self.date]
+
+    @staticmethod
+    def write(path: str, data):
+        # Columns are stored in getData() order (oldest first) so loading needs no reversal
+        wpm, accuracy, attempt, score, place, date = data
+        places, place_codes = np.unique(np.asarray(place, dtype=str), return_inverse=True)
+
+        values = {
+            "wpm": wpm,
+            "accuracy": accuracy,
+            "attempt": attempt,
+            "score": score,
+            "place": place_codes,
+            "date": np.asarray(date, dtype="datetime64[s]").astype(np.int64),
+        }
+
+        rows = len(wpm)
+        layout = []
+        offset = 0
+
+        for name, dtype in columns:
+            layout.append([name, dtype, offset])
+            offset = _align(offset + rows * np.dtype(dtype).itemsize)
+
+        header = json.dumps({"version": version, "rows": rows, "places": places.tolist(), "columns": layout}).encode()
+
+        with open(path, "wb") as f:
+            f.write(magic)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            data_start = _align(f.tell())
+
+            for name, dtype, offset in layout:
+                f.write(b"\0" * (data_start + offset - f.tell()))
+                f.write(np.ascontiguousarray(values[name], dtype=dtype).tobytes())
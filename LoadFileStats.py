@@ -1,27 +1,33 @@
-from datetime import datetime
-from numpy import array
+from itertools import islice
+import numpy as np
+from RaceHistory import RaceHistory
+
+columns = np.dtype([("attempt", "i8"), ("wpm", "i8"), ("accuracy", "f8"), ("score", "i8"), ("place", "O"), ("date", "M8[us]")])
 
 
 class LoadFileStats:
-    def __init__(self, filename: str):
-        self.wpm = []
-        self.accuracy = []
-        self.attempt = []
-        self.score = []
-        self.place = []
-        self.date = []
-
-        with (open(filename) as file):
-            for line in file:
-                attempt, wpm, accuracy, score, place, date = line.split(";")
-
-                self.wpm.append(int(wpm))
-                self.accuracy.append(float(accuracy))
-                self.attempt.append(int(attempt))
-                self.score.append(int(score))
-                self.place.append(place)
-                self.date.append(datetime.strptime(date, "%Y-%m-%d %H:%M:%S\n"))
+    def __init__(self, filename: str, chunk_size: int = 100_000):
+        # Parsed a chunk at a time so only one chunk of boxed place strings is alive at once
+        self.history = RaceHistory()
+
+        for chunk in self.chunks(filename, chunk_size):
+            self.history.extend(*chunk)
+
+        self.wpm, self.accuracy, self.attempt, self.score, self.place, self.date = self.history.appended()
+
+    @staticmethod
+    def _parse(lines):
+        rows = np.loadtxt(lines, delimiter=";", dtype=columns, ndmin=1, comments=None)
+
+        return (rows["wpm"], rows["accuracy"], rows["attempt"], rows["score"],
+                rows["place"].astype(str), rows["date"].astype("datetime64[s]"))
+
+    @classmethod
+    def chunks(cls, filename: str, chunk_size: int = 1_000_000):
+        # Yields the columns of chunk_size lines at a time, in file order (newest first)
+        with open(filename) as file:
+            while lines := list(islice(file, chunk_size)):
+                yield cls._parse(lines)
 
     def getData(self):
-        data = self.wpm, self.accuracy, self.attempt, self.score, self.place, self.date
-        return list(map(lambda d: array(list(reversed(d))), data))
+        return self.history.getData()
@@ -0,0 +1,165 @@
+import re
+import time
+from html import unescape
+from queue import Queue, Full, Empty
+from threading import Thread, Event
+import requests
+import Instrumentation
+from ResponseCache import ResponseCache
+
+
+class PageError(Exception):
+    # A response that is not a race history page, e.g. a rate limit or maintenance page, as opposed to the last page
+    def __init__(self, link: str, status: int, retry_after: float = None):
+        super().__init__(f"{link} returned {status} without a race history")
+        self.link = link
+        self.status = status
+        self.retry_after = retry_after
+
+
+class PageFetcher:
+    older_results = re.compile(r'<a[^>]*href="([^"]*)"[^>]*>\s*load older results', re.IGNORECASE)
+    race_history = re.compile(r'class="(?:[^"]*\bScores__Table\b|themeContent pit\b)')
+
+    def __init__(self, link: str, max_requests_per_second: float = 5, queue_size: int = 4, session: requests.Session = None,
+                 cache: ResponseCache = None):
+        self.link = link
+        self.cache = cache
+        self.min_interval = 1 / max_requests_per_second if max_requests_per_second else 0
+        self.queue_size = queue_size
+
+        self.session = session if session is not None else requests.Session()
+        self._last_request = 0
+
+    def nextLink(self, html: str):
+        # Only the cursor is needed to keep fetching, so skip the full parse here
+        match = self.older_results.search(html)
+
+        if match is None:
+            return None
+
+        return self.link + unescape(match.group(1))
+
+    @classmethod
+    def checkPage(cls, link: str, response: requests.Response):
+        # The last page, or the page of an account without races, is still a race history page, just without the older results link
+        if response.status_code == 200 and cls.race_history.search(response.text):
+            return response.text
+
+        retry_after = response.headers.get("Retry-After", "")
+        raise PageError(link, response.status_code, float(retry_after) if retry_after.isdigit() else None)
+
+    def cached(self, link: str):
+        # A cached page that does not need to be revalidated, None when the page has to be requested
+        if self.cache is None:
+            return None
+
+        entry = self.cache.load(link)
+        if entry is None or not self.cache.isFresh(link, entry):
+            return None
+
+        self.cache.touch(link)
+        Instrumentation.count("scrape_cache_hits")
+        return entry["text"]
+
+    def request(self, link: str, timeout: float = None):
+        entry = self.cache.load(link) if self.cache is not None else None
+
+        with Instrumentation.timer("scrape_fetch_seconds"):
+            response = self.session.get(link, headers=ResponseCache.conditionalHeaders(entry), timeout=timeout)
+
+        Instrumentation.count("scrape_pages_fetched")
+        Instrumentation.count("scrape_bytes_downloaded", len(response.content))
+
+        if entry is not None and response.status_code == 304:
+            Instrumentation.count("scrape_cache_revalidated")
+            self.cache.store(link, entry["text"], {"ETag": response.headers.get("ETag", entry["etag"]),
+                                                   "Last-Modified": response.headers.get("Last-Modified", entry["last_modified"])})
+            return entry["text"]
+
+        html = self.checkPage(link, response)
+
+        # Error pages are never cached, checkPage raised for them
+        if self.cache is not None:
+            self.cache.store(link, html, response.headers)
+
+        return html
+
+    def _wait(self):
+        delay = self._last_request + self.min_interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        self._last_request = time.monotonic()
+
+    def _put(self, pages: Queue, stop: Event, item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+
+        return False
+
+    def _page(self, link: str):
+        html = self.cached(link)
+
+        if html is None:
+            with Instrumentation.timer("scrape_rate_limit_wait_seconds"):
+                self._wait()
+
+            html = self.request(link)
+
+        return html
+
+    def _fetch(self, next_link: str, pages: Queue, stop: Event):
+        try:
+            while next_link is not None and not stop.is_set():
+                html = self._page(next_link)
+
+                if not self._put(pages, stop, html):
+                    return
+
+                next_link = self.nextLink(html)
+        except Exception as e:
+            self._put(pages, stop, e)
+            return
+
+        self._put(pages, stop, None)
+
+    def pages(self, first_link: str, prefetch: bool = True):
+        # Without prefetch a page is only requested once the previous one was consumed, so stopping early fetches nothing extra
+        if not prefetch:
+            next_link = first_link
+
+            while next_link is not None:
+                html = self._page(next_link)
+                yield html
+                next_link = self.nextLink(html)
+
+            return
+
+        pages = Queue(maxsize=self.queue_size)
+        stop = Event()
+        fetcher = Thread(target=self._fetch, args=(first_link, pages, stop), daemon=True)
+        fetcher.start()
+
+        try:
+            while True:
+                try:
+                    html = pages.get(timeout=0.1)
+                except Empty:
+                    if not fetcher.is_alive() and pages.empty():
+                        break
+                    continue
+
+                if html is None:
+                    break
+
+                if isinstance(html, Exception):
+                    raise html
+
+                yield html
+        finally:
+            stop.set()
@@ -0,0 +1,91 @@
+import numpy as np
+from RaceIndex import RaceIndex
+
+fields = ("wpm", "accuracy", "attempt", "score", "place", "date")
+dtypes = {"wpm": "i4", "accuracy": "f8", "attempt": "i4", "score": "i4", "place": "u2", "date": "datetime64[s]"}
+
+
+class RaceHistory:
+    def __init__(self, capacity: int = 1024, newest_first: bool = True):
+        # Rows are kept in the order they are appended, newest_first says which end getData() has to start from
+        self.rows = 0
+        self.newest_first = newest_first
+        self.places = []
+        self._place_codes = {}
+        self._columns = {name: np.empty(max(capacity, 1), dtype=dtypes[name]) for name in fields}
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        # Lets a history be unpacked like the list returned by getData()
+        return iter(self.getData())
+
+    def _reserve(self, extra: int):
+        capacity = len(self._columns["wpm"])
+        if self.rows + extra <= capacity:
+            return
+
+        capacity = max(capacity * 2, self.rows + extra)
+
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.rows] = column[:self.rows]
+            self._columns[name] = grown
+
+    def _encodePlaces(self, place):
+        names, codes = np.unique(np.asarray(place, dtype=str), return_inverse=True)
+
+        for name in names.tolist():
+            if name not in self._place_codes:
+                self._place_codes[name] = len(self.places)
+                self.places.append(name)
+
+        return np.array([self._place_codes[name] for name in names.tolist()], dtype=dtypes["place"])[codes.ravel()]
+
+    def extend(self, wpm, accuracy, attempt, score, place, date):
+        # Appends a chunk of rows, every argument is a sequence or array of the same length
+        amount = len(attempt)
+        self._reserve(amount)
+        end = self.rows + amount
+
+        self._columns["wpm"][self.rows:end] = wpm
+        self._columns["accuracy"][self.rows:end] = accuracy
+        self._columns["attempt"][self.rows:end] = attempt
+        self._columns["score"][self.rows:end] = score
+        self._columns["place"][self.rows:end] = self._encodePlaces(place) if amount else []
+        self._columns["date"][self.rows:end] = np.asarray(date, dtype=dtypes["date"])
+        self.rows = end
+
+    def column(self, name: str):
+        # View of the appended rows in getData() order (oldest first), place holds the codes into self.places
+        column = self._columns[name][:self.rows]
+        return column[::-1] if self.newest_first else column
+
+    def decodePlaces(self, codes):
+        return np.array(self.places, dtype=str)[codes] if self.places else np.array([], dtype=str)
+
+    def getData(self, start: int = 0, stop: int = None):
+        data = [self.column(name)[start:stop] for name in fields]
+        data[4] = self.decodePlaces(data[4])
+        return data
+
+    def appended(self):
+        # Columns in append order, e.g. newest first for a scraped history
+        data = [self._columns[name][:self.rows] for name in fields]
+        data[4] = self.decodePlaces(data[4])
+        return data
+
+    def index(self):
+        # Place holds codes, getData() decodes the rows of a window
+        return RaceIndex([self.column(name) for name in fields])
+
+    def attempts(self, start: int = None, end: int = None):
+        # Inclusive range of attempt numbers, every column but place is a view
+        window = self.index().attempts(start, end)
+        return self.getData(window.start, window.stop)
+
+    def dates(self, start=None, end=None):
+        # Inclusive range of dates, see RaceIndex.dates
+        window = self.index().dates(start, end)
+        return self.getData(window.start, window.stop)
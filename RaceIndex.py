@@ -0,0 +1,45 @@
+import numpy as np
+
+# First month of every season, winter starts in december of the year before
+seasons = {"winter": 12, "spring": 3, "summer": 6, "autumn": 9}
+
+
+class RaceIndex:
+    def __init__(self, data):
+        # data is in getData() order, attempts and dates ascending; every query is a binary search that returns a slice of rows
+        self.data = data
+        self.attempt = np.asarray(data[2])
+        self.date = np.asarray(data[5], dtype="datetime64[s]")
+
+    def __len__(self):
+        return len(self.attempt)
+
+    def view(self, window: slice):
+        # Columns restricted to the window, every one of them a view
+        return [column[window] for column in self.data]
+
+    def attempts(self, start: int = None, end: int = None):
+        # Inclusive range of attempt numbers
+        return slice(int(np.searchsorted(self.attempt, start, "left")) if start is not None else 0,
+                     int(np.searchsorted(self.attempt, end, "right")) if end is not None else len(self))
+
+    def dates(self, start=None, end=None):
+        # Inclusive range of dates, end covers its whole unit: "2023-12-31" runs until midnight
+        return slice(int(np.searchsorted(self.date, np.datetime64(start).astype("datetime64[s]"), "left")) if start is not None else 0,
+                     int(np.searchsorted(self.date, (np.datetime64(end) + 1).astype("datetime64[s]"), "left")) if end is not None else len(self))
+
+    def last(self, days: float, until=None):
+        # Races in the days before until, which defaults to the last race
+        if not len(self):
+            return slice(0, 0)
+
+        until = np.datetime64(until).astype("datetime64[s]") if until is not None else self.date[-1]
+        since = until - np.timedelta64(int(days * 24 * 3600), "s")
+        return slice(int(np.searchsorted(self.date, since, "right")), int(np.searchsorted(self.date, until, "right")))
+
+    def season(self, year: int, name: str):
+        if name not in seasons:
+            raise ValueError(f"Unknown season: {name}, expected one of {tuple(seasons)}")
+
+        start = np.datetime64(f"{year - 1 if name == 'winter' else year}-{seasons[name]:02d}", "M")
+        return self.dates(start, start + 2)
@@ -0,0 +1,75 @@
+import sqlite3
+import numpy as np
+
+columns = np.dtype([("wpm", "i8"), ("accuracy", "f8"), ("attempt", "i8"), ("score", "i8"), ("place", "O"), ("date", "i8")])
+
+
+class RaceStore:
+    def __init__(self, path: str = "races.sqlite", check_same_thread: bool = True):
+        self.connection = sqlite3.connect(path, check_same_thread=check_same_thread)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS races (
+                username TEXT NOT NULL,
+                universe TEXT NOT NULL,
+                attempt INTEGER NOT NULL,
+                wpm INTEGER NOT NULL,
+                accuracy REAL NOT NULL,
+                score INTEGER NOT NULL,
+                place TEXT NOT NULL,
+                date INTEGER NOT NULL,
+                PRIMARY KEY (username, universe, attempt)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS races_date ON races (username, universe, date);
+            CREATE INDEX IF NOT EXISTS races_wpm ON races (username, universe, wpm);
+        """)
+
+    def upsert(self, username: str, universe: str, data):
+        wpm, accuracy, attempt, score, place, date = data
+        date = np.asarray(date, dtype="datetime64[s]").astype(np.int64)
+        rows = zip([username] * len(attempt), [universe] * len(attempt), np.asarray(attempt).tolist(), np.asarray(wpm).tolist(),
+                   np.asarray(accuracy).tolist(), np.asarray(score).tolist(), np.asarray(place, dtype=str).tolist(), date.tolist())
+
+        with self.connection:
+            self.connection.executemany("""
+                INSERT INTO races (username, universe, attempt, wpm, accuracy, score, place, date)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (username, universe, attempt) DO UPDATE SET
+                    wpm = excluded.wpm, accuracy = excluded.accuracy, score = excluded.score,
+                    place = excluded.place, date = excluded.date
+            """, rows)
+
+    def upsertScraper(self, scraper):
+        # After an incremental sync the scraper also holds every stored race, only the ones past them are written
+        last_attempt = self.lastAttempt(scraper.username, scraper.universe)
+        self.upsert(scraper.username, scraper.universe, scraper.history.attempts(last_attempt + 1) if last_attempt is not None else scraper.getData())
+
+    def getData(self, username: str, universe: str = "", start_date=None, end_date=None, start_attempt: int = None, end_attempt: int = None):
+        # Ranges are inclusive, the result is in the same order as StatsScraper.getData()
+        query = "SELECT wpm, accuracy, attempt, score, place, date FROM races WHERE username = ? AND universe = ?"
+        parameters = [username, universe]
+
+        if start_date is not None:
+            query += " AND date >= ?"
+            parameters.append(int(np.datetime64(start_date, "s").astype(np.int64)))
+        if end_date is not None:
+            query += " AND date <= ?"
+            parameters.append(int(np.datetime64(end_date, "s").astype(np.int64)))
+        if start_attempt is not None:
+            query += " AND attempt >= ?"
+            parameters.append(start_attempt)
+        if end_attempt is not None:
+            query += " AND attempt <= ?"
+            parameters.append(end_attempt)
+
+        rows = np.array(self.connection.execute(query + " ORDER BY attempt", parameters).fetchall(), dtype=columns)
+
+        return [rows["wpm"], rows["accuracy"], rows["attempt"], rows["score"], rows["place"].astype(str), rows["date"].astype("datetime64[s]")]
+
+    def lastAttempt(self, username: str, universe: str = ""):
+        return self.connection.execute("SELECT MAX(attempt) FROM races WHERE username = ? AND universe = ?", (username, universe)).fetchone()[0]
+
+    def accounts(self):
+        return self.connection.execute("SELECT DISTINCT username, universe FROM races ORDER BY username, universe").fetchall()
+
+    def close(self):
+        self.connection.close()
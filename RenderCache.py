@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from contextlib import suppress
+from functools import wraps
+from inspect import signature
+import numpy as np
+import Instrumentation
+
+cache_version = 1
+
+
+def fingerprint(data):
+    digest = hashlib.blake2b(digest_size=16)
+    wpm, accuracy, attempt, score, place, date = data
+
+    for column in (np.asarray(wpm), np.asarray(accuracy), np.asarray(attempt), np.asarray(score),
+                   np.asarray(place, dtype=str), np.asarray(date, dtype="datetime64[us]")):
+        digest.update(column.dtype.str.encode())
+        digest.update(np.ascontiguousarray(column).tobytes())
+
+    return digest.hexdigest()
+
+
+class RenderCache:
+    def __init__(self, directory: str = "./img/.cache", max_bytes: int = 256 * 1024 ** 2, max_age_seconds: float = 30 * 24 * 3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+    def key(self, data_fingerprint: str, method: str, parameters: dict):
+        parameters = {name: getattr(value, "fingerprint", lambda: value)() for name, value in parameters.items()}
+        description = json.dumps([cache_version, data_fingerprint, method, parameters], sort_keys=True, default=repr)
+        return hashlib.blake2b(description.encode(), digest_size=16).hexdigest()
+
+    def _entry(self, key: str, index: int, output: str):
+        return os.path.join(self.directory, f"{key}-{index}{os.path.splitext(output)[1]}")
+
+    def _record(self, output: str):
+        # One record per output keeps concurrent renders (see GraphMaker.renderAll) from overwriting each other
+        name = hashlib.blake2b(os.path.abspath(output).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, "outputs", f"{name}.json")
+
+    def _isCurrent(self, key: str, output: str):
+        try:
+            with open(self._record(output)) as f:
+                recorded_key, state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, ValueError):
+            return False
+
+        return recorded_key == key and os.path.exists(output) and self._state(output) == state
+
+    def _remember(self, key: str, output: str):
+        record = self._record(output)
+        os.makedirs(os.path.dirname(record), exist_ok=True)
+
+        temporary = f"{record}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump([key, self._state(output)], f)
+        os.replace(temporary, record)
+
+    @staticmethod
+    def _state(path: str):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def restore(self, key: str, outputs):
+        # Returns True when every output already holds, or was copied back to, the render for key
+        stale = [(index, output) for index, output in enumerate(outputs) if not self._isCurrent(key, output)]
+
+        if not stale:
+            return True
+
+        if not all(os.path.exists(self._entry(key, index, output)) for index, output in stale):
+            return False
+
+        for index, output in stale:
+            entry = self._entry(key, index, output)
+            shutil.copyfile(entry, output)
+            os.utime(entry)  # Keeps the entry recent for the eviction order
+            self._remember(key, output)
+
+        return True
+
+    def store(self, key: str, outputs):
+        os.makedirs(self.directory, exist_ok=True)
+
+        for index, output in enumerate(outputs):
+            shutil.copyfile(output, self._entry(key, index, output))
+            self._remember(key, output)
+
+        self.evict()
+
+    def evict(self):
+        # Entries past max_age_seconds go first, then the least recently used until the cache fits in max_bytes
+        entries = []
+        now = time.time()
+
+        with suppress(FileNotFoundError):  # Another worker may evict at the same time
+            for entry in os.scandir(self.directory):
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes and now - mtime <= self.max_age_seconds:
+                continue
+
+            with suppress(FileNotFoundError):
+                os.remove(path)
+            total -= size
+
+
+def _renderKey(graph, method, args, kwargs):
+    parameters = signature(method).bind(graph, *args, **kwargs)
+    parameters.apply_defaults()
+    del parameters.arguments["self"]
+
+    return graph.render_cache.key(graph.fingerprint(), method.__name__, parameters.arguments)
+
+
+def restoreRender(graph, name: str, kwargs: dict):
+    method = getattr(type(graph), name)
+
+    if graph.render_cache is None or not hasattr(method, "outputs"):
+        return False
+
+    return graph.render_cache.restore(_renderKey(graph, method.__wrapped__, (), kwargs), list(method.outputs))
+
+
+def cachedRender(*outputs):
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.render_cache is None:
+                with Instrumentation.chart(method.__name__):
+                    return method(self, *args, **kwargs)
+
+            key = _renderKey(self, method, args, kwargs)
+
+            if self.render_cache.restore(key, list(outputs)):
+                Instrumentation.count("render_cache_hits", chart=method.__name__)
+                return None
+
+            Instrumentation.count("render_cache_misses", chart=method.__name__)
+
+            with Instrumentation.chart(method.__name__):
+                result = method(self, *args, **kwargs)
+
+            self.render_cache.store(key, list(outputs))
+            return result
+
+        wrapper.outputs = outputs
+        return wrapper
+
+    return decorator
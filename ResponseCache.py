@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import time
+import zlib
+from contextlib import suppress
+from threading import Lock, get_ident
+from urllib.parse import urlparse, parse_qs
+
+
+class ResponseCache:
+    def __init__(self, directory: str = "./.cache/pages", max_bytes: int = 512 * 1024 ** 2, max_age_seconds: float = 0):
+        # Pages with a startDate cursor only hold older races and never expire, the first page is revalidated after max_age_seconds
+        # The cursors follow from the first page, so a new race shifts every one of them and older pages only hit until the next race
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._bytes = None
+        self._lock = Lock()
+
+    @staticmethod
+    def immutable(link: str):
+        return any(parse_qs(urlparse(link).query).get("startDate", []))
+
+    def _entry(self, link: str):
+        return os.path.join(self.directory, hashlib.blake2b(link.encode(), digest_size=16).hexdigest() + ".page")
+
+    def load(self, link: str):
+        # The cached page as a dict of url, etag, last_modified, stored and text, None when there is none
+        path = self._entry(link)
+
+        try:
+            with open(path, "rb") as f:
+                header, text = zlib.decompress(f.read()).split(b"\n", 1)
+
+            entry = json.loads(header)
+            url = entry["url"]
+            entry["text"] = text.decode()
+        except FileNotFoundError:
+            return None
+        except (zlib.error, ValueError, KeyError, TypeError):
+            # A truncated or corrupt entry is a miss, and is removed so it does not count against max_bytes
+            with suppress(FileNotFoundError):
+                os.remove(path)
+            return None
+
+        return entry if url == link else None
+
+    def isFresh(self, link: str, entry: dict):
+        return self.immutable(link) or time.time() - entry["stored"] < self.max_age_seconds
+
+    @staticmethod
+    def conditionalHeaders(entry: dict):
+        headers = {}
+
+        if entry is not None and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry is not None and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        return headers
+
+    def touch(self, link: str):
+        # Keeps the entry recent for the eviction order
+        with suppress(FileNotFoundError):
+            os.utime(self._entry(link))
+
+    def store(self, link: str, text: str, headers):
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {"url": link, "etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified"), "stored": time.time()}
+        data = zlib.compress(json.dumps(entry).encode() + b"\n" + text.encode())
+
+        path = self._entry(link)
+        temporary = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+
+        with self._lock:
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(temporary, path)
+
+            # The size is only counted from disk once, later stores keep a running total
+            if self._bytes is None:
+                self._bytes = self._scan()[1]
+            else:
+                self._bytes += len(data) - previous
+
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        entries = []
+
+        with suppress(FileNotFoundError):
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith(".page"):
+                    with suppress(FileNotFoundError):  # Another process may evict at the same time
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        return entries, sum(size for _, size, _ in entries)
+
+    def _evict(self):
+        # Least recently used first, down to max_bytes
+        entries, self._bytes = self._scan()
+
+        for mtime, size, path in sorted(entries):
+            if self._bytes <= self.max_bytes:
+                break
+
+            with suppress(FileNotFoundError):
+                os.remove(path)
+            self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            for _, _, path in self._scan()[0]:
+                with suppress(FileNotFoundError):
+                    os.remove(path)
+
+            self._bytes = 0
@@ -0,0 +1,153 @@
+from collections import defaultdict
+from heapq import heappop, heappush
+import numpy as np
+
+
+class _WindowMedian:
+    # The lower half of the window in a max heap, the upper half in a min heap, O(log n) per added or removed race
+    # Removed races are only popped once they reach the top of their heap
+    def __init__(self):
+        self.low = []  # negated
+        self.high = []
+        self.removed = defaultdict(int)
+        self.low_size = 0
+        self.high_size = 0
+
+    def _prune(self, heap, sign):
+        while heap and self.removed[sign * heap[0]]:
+            self.removed[sign * heap[0]] -= 1
+            heappop(heap)
+
+    def _balance(self):
+        # low holds as many races as high or one more
+        if self.low_size > self.high_size + 1:
+            heappush(self.high, -heappop(self.low))
+            self.low_size -= 1
+            self.high_size += 1
+        elif self.low_size < self.high_size:
+            heappush(self.low, -heappop(self.high))
+            self.high_size -= 1
+            self.low_size += 1
+
+        self._prune(self.low, -1)
+        self._prune(self.high, 1)
+
+    def add(self, value):
+        if not self.low or value <= -self.low[0]:
+            heappush(self.low, -value)
+            self.low_size += 1
+        else:
+            heappush(self.high, value)
+            self.high_size += 1
+
+        self._balance()
+
+    def remove(self, value):
+        self.removed[value] += 1
+
+        if value <= -self.low[0]:
+            self.low_size -= 1
+        else:
+            self.high_size -= 1
+
+        self._balance()
+
+    def median(self):
+        return -self.low[0] if self.low_size > self.high_size else (-self.low[0] + self.high[0]) / 2
+
+
+class RollingStats:
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=float)
+        # Shifting by the mean keeps the sums of squares small enough for a stable variance
+        self.offset = self.values.mean() if len(self.values) else 0.0
+        shifted = self.values - self.offset
+
+        self.sums = np.concatenate(([0.0], np.cumsum(shifted)))
+        self.squares = np.concatenate(([0.0], np.cumsum(shifted ** 2)))
+
+    @classmethod
+    def fromSums(cls, values, sums, squares, offset: float):
+        # Prefix sums kept elsewhere (e.g. by a StatsSnapshot) are used as they are, without a pass over the values
+        stats = cls.__new__(cls)
+        stats.values = np.asarray(values)
+        stats.offset = offset
+        stats.sums = sums
+        stats.squares = squares
+        return stats
+
+    def __len__(self):
+        return len(self.values)
+
+    def runningAverage(self):
+        return self.sums[1:] / np.arange(1, len(self) + 1) + self.offset
+
+    def averagesOfN(self, n: int):
+        # Mean of every full window of n races, the window starting at race i is at index i
+        return (self.sums[n:] - self.sums[:-n]) / n + self.offset
+
+    def runningAverageOfN(self, n: int):
+        # Expanding average for the first n - 1 races, then the average of the last n
+        n = max(min(n, len(self)), 1)
+        expanding = self.sums[1:n] / np.arange(1, n) + self.offset
+        return np.concatenate((expanding, self.averagesOfN(n)))
+
+    def bestAverageOfN(self, ns):
+        # (start index, average) of the best window for every n in ns
+        return self._extremes(ns, np.argmax)
+
+    def worstAverageOfN(self, ns):
+        return self._extremes(ns, np.argmin)
+
+    def meanAverageOfN(self, ns):
+        # The windows of size n sum to sums[n:].sum() - sums[:-n].sum(), both are read off the prefix sums of the sums
+        ns = np.atleast_1d(ns)
+        self._checkSizes(ns)
+        totals = np.concatenate(([0.0], np.cumsum(self.sums)))
+        windows = len(self) - ns + 1
+        return (totals[-1] - totals[ns] - totals[windows]) / (windows * ns) + self.offset
+
+    def _checkSizes(self, ns):
+        if len(ns) and (ns.min() < 1 or ns.max() > len(self)):
+            raise ValueError(f"Window sizes have to be between 1 and the {len(self)} races, got {ns.tolist()}")
+
+    def _extremes(self, ns, pick):
+        # One O(N) pass over the prefix sums per size, slicing them beats gathering every size's windows in one array
+        ns = np.atleast_1d(ns)
+        self._checkSizes(ns)
+        indices = []
+        averages = []
+
+        for n in ns:
+            windows = self.averagesOfN(n)
+            index = pick(windows)
+            indices.append(index)
+            averages.append(windows[index])
+
+        return np.array(indices, dtype=np.int64), np.array(averages)
+
+    def rollingStd(self, n: int):
+        sums = self.sums[n:] - self.sums[:-n]
+        squares = self.squares[n:] - self.squares[:-n]
+        return np.sqrt(np.maximum(squares / n - (sums / n) ** 2, 0))
+
+    def rollingMedian(self, n: int):
+        # Median of every full window of n races, every step adds one race and removes the oldest in O(log n)
+        if n < 1 or n > len(self):
+            return np.empty(0)
+
+        values = self.values.tolist()
+        window = _WindowMedian()
+        medians = np.empty(len(values) - n + 1)
+
+        for value in values[:n]:
+            window.add(value)
+
+        for i in range(len(medians)):
+            medians[i] = window.median()
+
+            if i + n < len(values):
+                window.remove(values[i])
+                window.add(values[i + n])
+
+        return medians
@@ -0,0 +1,41 @@
+from lxml import etree
+
+
+class RowExtractor:
+    row_class = "Scores__Table__Row"
+
+    def __init__(self):
+        self.rows = []
+        self._depth = 0
+        self._text = []
+
+    def start(self, tag, attrib):
+        if self._depth:
+            if tag == "div":
+                self._depth += 1
+        elif tag == "div" and self.row_class in attrib.get("class", "").split():
+            self._depth = 1
+            self._text = []
+
+    def end(self, tag):
+        if self._depth and tag == "div":
+            self._depth -= 1
+
+            if not self._depth:
+                self.rows.append([i.strip() for i in "".join(self._text).strip().split("\n") if i.strip()])
+
+    def data(self, data):
+        if self._depth:
+            self._text.append(data)
+
+    def close(self):
+        rows = self.rows
+        self.rows = []
+        return rows
+
+    @classmethod
+    def extract(cls, html: str):
+        # Streams parser events into the row buffer instead of building a document tree
+        parser = etree.HTMLParser(target=cls())
+        parser.feed(html)
+        return parser.close()
@@ -1,75 +1,122 @@
 from datetime import datetime
-from numpy import array
-import requests
-from bs4 import BeautifulSoup
+import numpy as np
+import Instrumentation
+from LoadBinaryStats import LoadBinaryStats
+from PageFetcher import PageFetcher
+from RaceHistory import RaceHistory
+from ResponseCache import ResponseCache
+from RowExtractor import RowExtractor
+
+months = {month: i + 1 for i, month in enumerate(['Jan.', 'Feb.', 'March', 'April', 'May', 'June', 'July', 'Aug.', 'Sept.', 'Oct.', 'Nov.', 'Dec.'])}
 
 
 class StatsScraper:
-    def __init__(self, username: str, universe: str = "", start_date: datetime = None):
+    def __init__(self, username: str, universe: str = "", start_date: datetime = None, max_requests_per_second: float = 5, known_data=None,
+                 link: str = "https://data.typeracer.com/pit/race_history", crawl: bool = True, response_cache: ResponseCache = None):
         amount = 1550  # n=2147483647
-        link = "https://data.typeracer.com/pit/race_history"
-        next_link = f"{link}?user={username}&n={amount}&startDate=&universe={universe}"
-
-        self.wpm = []
-        self.accuracy = []
-        self.attempt = []
-        self.score = []
-        self.place = []
-        self.date = []
-
-        while True:
-            html = requests.get(next_link).text
-            data = BeautifulSoup(html, 'lxml')
-
-            self._retrieveData(data.find_all('div', class_="Scores__Table__Row"), start_date)
-
-            try:
-                next_link = data.find('div', class_="themeContent pit").find_all("span")[-1]
-                if next_link.text == """\n\n          load older results »\n        \n""":
-                    next_link = link + next_link.find("a").get("href")
-                else:
-                    break
-            except AttributeError as e:
-                break
-            except IndexError as e:
+
+        self.username = username
+        self.universe = universe
+        self.start_date = start_date
+        self.known_data = known_data
+        self.first_link = f"{link}?user={username}&n={amount}&startDate=&universe={universe}"
+        self.last_attempt = max(known_data[2], default=None) if known_data is not None else None
+        self.history = RaceHistory(amount)
+        self._dates = {}
+
+        if not crawl:
+            # Pages are handed in through addPage(), e.g. by AsyncCrawler
+            return
+
+        fetcher = PageFetcher(link, max_requests_per_second=max_requests_per_second, cache=response_cache)
+
+        # An incremental sync stops at the first known race, prefetching would request pages past it
+        for html in fetcher.pages(self.first_link, prefetch=known_data is None):
+            if not self.addPage(html):
                 break
 
+        self.finish()
+
+    def addPage(self, html: str):
+        # False once the page reached races that are already known
+        with Instrumentation.timer("scrape_parse_seconds"):
+            return self._retrieveData(RowExtractor.extract(html), self.start_date, self.last_attempt)
+
+    def finish(self):
+        if self.known_data is not None:
+            self._merge(self.known_data)
+            self.known_data = None
+
         print("Done loading data.")
 
-    def _retrieveData(self, data, start_date):
-        for item in data:
-            attempt, wpm, accuracy, score, place, date = [i.strip() for i in item.text.strip().split("\n") if i.strip()]
+    def _retrieveData(self, data, start_date, last_attempt=None):
+        rows = [], [], [], [], [], []
+        wpms, accuracies, attempts, scores, places, dates = rows
+        filtered = 0
+        consumed = 0
+        more = True
+
+        for attempt, wpm, accuracy, score, place, date in data:
+            if last_attempt is not None and int(attempt) <= last_attempt:
+                more = False
+                break
+
+            consumed += 1
+
             item_date = self._toDatetime(date)
 
             if start_date is not None and item_date < start_date:
+                filtered += 1
                 continue
 
-            self.wpm.append(int(wpm.split(" ")[0]))
-            self.accuracy.append((round(float(accuracy.replace("%", "")) / 100, 3)))
-            self.attempt.append(int(attempt))
-            self.score.append(int(score if score != "N/A" else 0))
-            self.place.append(place)
-            self.date.append(item_date)
+            wpms.append(int(wpm.split(" ")[0]))
+            accuracies.append((round(float(accuracy.replace("%", "")) / 100, 3)))
+            attempts.append(int(attempt))
+            scores.append(int(score if score != "N/A" else 0))
+            places.append(place)
+            dates.append(item_date)
+
+        # Only one page of boxed values is alive at a time, the history keeps typed arrays
+        self.history.extend(*rows)
+        Instrumentation.count("scrape_rows_parsed", consumed)
+        Instrumentation.count("scrape_rows_filtered_start_date", filtered)
+
+        return more
+
+    def _merge(self, known_data):
+        # known_data is in getData() order (oldest first), the scraped history is newest first
+        if self.start_date is not None:
+            # Same filter as the scraped pages
+            kept = np.asarray(known_data[5], dtype="datetime64[s]") >= np.datetime64(self.start_date, "s")
+            known_data = [np.asarray(column)[kept] for column in known_data]
+
+        self.history.extend(*(column[::-1] for column in known_data))
 
     def _toDatetime(self, current_date: str) -> datetime:
-        months = ['Jan.', 'Feb.', 'March', 'April', 'May', 'June', 'July', 'Aug.', 'Sept.', 'Oct.', 'Nov.', 'Dec.']
         if current_date == "today":
-            current_date = datetime.today()  # trim microseconds
-        else:
-            month, day, year = current_date.split(" ")
-            day = int(day[:-1])
-            month = months.index(month) + 1
-            year = int(year)
+            return datetime.today()  # trim microseconds
+
+        parsed = self._dates.get(current_date)
 
-            current_date = datetime(year, month, day)
+        if parsed is None:
+            month, day, year = current_date.split(" ")
+            parsed = self._dates[current_date] = datetime(int(year), months[month], int(day[:-1]))
 
-        return current_date
+        return parsed
 
     def getData(self):
-        data = self.wpm, self.accuracy, self.attempt, self.score, self.place, self.date
-        return list(map(lambda d: array(list(reversed(d))), data))
+        return self.history.getData()
+
+    def download(self, path: str, chunk_size: int = 10_000):
+        # Rows are boxed a chunk at a time, newest first like the scraped pages
+        wpm, accuracy, attempt, score, place, date = self.history.appended()
 
-    def download(self, path: str):
         with open(path, "w") as f:
-            for attempt, wpm, accuracy, score, place, date in zip(self.attempt, self.wpm, self.accuracy, self.score, self.place, self.date):
-                f.write(f"{attempt};{wpm};{accuracy};{score};{place};{date}\n")
+            for start in range(0, len(attempt), chunk_size):
+                chunk = slice(start, start + chunk_size)
+                rows = zip(attempt[chunk].tolist(), wpm[chunk].tolist(), accuracy[chunk].tolist(), score[chunk].tolist(),
+                           place[chunk].tolist(), np.char.replace(date[chunk].astype(str), "T", " ").tolist())
+                f.writelines("%s;%s;%s;%s;%s;%s\n" % row for row in rows)
+
+    def downloadBinary(self, path: str):
+        LoadBinaryStats.write(path, self.getData())
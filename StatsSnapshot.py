@@ -0,0 +1,255 @@
+import json
+import os
+from contextlib import suppress
+from urllib.parse import quote
+import numpy as np
+from Aggregation import Buckets, bucketStarts
+from RollingStats import RollingStats
+
+version = 1
+series = ("wpm", "accuracy")
+# Prefix sums and PBs grow with the history and are only ever appended to their files, which are memory-mapped when loaded
+# Windows can not resize a mapped file: arrays taken from a snapshot (e.g. a GraphMaker's RollingStats) have to be
+# dropped before the snapshot is appended to there, POSIX systems have no such restriction
+growing = {"sums": "<f8", "squares": "<f8", "pb_index": "<i8", "pb": "<f8"}
+# Accuracy histograms count whole percentages, the edges are the same floats GraphMaker's bins use
+accuracy_edges = np.arange(102) / 100
+
+
+def _codes(name: str, values):
+    if name == "wpm":
+        return np.asarray(values).astype(np.int64)
+
+    return np.searchsorted(accuracy_edges, values, side="right") - 1
+
+
+class StatsSnapshot:
+    def __init__(self, directory: str):
+        # Running sums, PBs, daily buckets and histograms of one account, appending races only reads the new ones
+        self.directory = directory
+        self._arrays = {}
+        self._tables = {}
+
+        try:
+            with open(os.path.join(directory, "header.json")) as f:
+                self.header = json.load(f)
+        except FileNotFoundError:
+            self.header = None
+
+        if self.header is not None and self.header["version"] != version:
+            raise ValueError(f"Unsupported stats snapshot version {self.header['version']}")
+
+        if self.header is None:
+            self.header = self._emptyHeader()
+
+        self._load()
+
+    @classmethod
+    def account(cls, directory: str, username: str, universe: str = ""):
+        return cls(os.path.join(directory, f"{quote(username, safe='')}@{quote(universe, safe='')}"))
+
+    @staticmethod
+    def _emptyHeader():
+        return {"version": version, "rows": 0, "last_attempt": None, "tables": None,
+                "offsets": {name: 0.0 for name in series}, "minimum": {}, "maximum": {},
+                "lengths": {f"{name}.{array}": 0 for name in series for array in growing}}
+
+    @property
+    def rows(self):
+        return self.header["rows"]
+
+    @property
+    def last_attempt(self):
+        return self.header["last_attempt"]
+
+    def _path(self, name: str):
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        for name, length in self.header["lengths"].items():
+            dtype = growing[name.split(".")[1]]
+            self._arrays[name] = np.memmap(self._path(name), dtype=dtype, mode="r", shape=(length,)) if length else np.zeros(0, dtype)
+
+        self._tables = {}
+        if self.header["tables"] is not None:
+            with np.load(self._path(self.header["tables"])) as tables:
+                self._tables = dict(tables)
+
+    def covers(self, attempt):
+        # True when the snapshot holds exactly the races of a full history, given its attempt column oldest first
+        return len(attempt) == self.rows and (self.rows == 0 or int(attempt[-1]) == self.last_attempt)
+
+    def update(self, data):
+        # Only the races past the snapshot are read, a history that no longer matches it is taken in from scratch
+        wpm, accuracy, attempt, score, place, date = data
+
+        if self.rows > len(attempt) or (self.rows and int(attempt[self.rows - 1]) != self.last_attempt):
+            self.clear()
+
+        if len(attempt) > self.rows:
+            self.append(wpm[self.rows:], accuracy[self.rows:], attempt[self.rows:], date[self.rows:])
+
+        return self
+
+    def append(self, wpm, accuracy, attempt, date):
+        # New races oldest first, all of them after the last attempt in the snapshot
+        attempt = np.asarray(attempt)
+        if not len(attempt):
+            return
+
+        if self.last_attempt is not None and attempt[0] <= self.last_attempt:
+            raise ValueError(f"Appended races have to come after attempt {self.last_attempt}, got {attempt[0]}")
+
+        os.makedirs(self.directory, exist_ok=True)
+        header = json.loads(json.dumps(self.header))
+        days = np.asarray(date, dtype="datetime64[D]").astype(np.int64)
+        new_days, group = np.unique(days, return_inverse=True)
+        tables = {"days": new_days, "day_count": np.bincount(group)}
+        appended = {}
+
+        for name, values in zip(series, (wpm, accuracy)):
+            values = np.asarray(values, dtype=float)
+
+            if not self.rows:
+                header["offsets"][name] = float(values.mean())
+
+            # Prefix sums of the values shifted by the first batch's mean, in the layout RollingStats keeps
+            shifted = values - header["offsets"][name]
+            new_sums = np.cumsum(shifted) + self._last(f"{name}.sums", 0.0)
+            new_squares = np.cumsum(shifted ** 2) + self._last(f"{name}.squares", 0.0)
+
+            appended[f"{name}.sums"] = new_sums if self.rows else np.concatenate(([0.0], new_sums))
+            appended[f"{name}.squares"] = new_squares if self.rows else np.concatenate(([0.0], new_squares))
+
+            previous = self._last(f"{name}.pb", -np.inf)
+            best = np.maximum(np.maximum.accumulate(values), previous)
+            index = np.flatnonzero(np.diff(best, prepend=previous) > 0)
+            appended[f"{name}.pb_index"] = index + self.rows
+            appended[f"{name}.pb"] = best[index]
+
+            header["minimum"][name] = min(float(values.min()), header["minimum"].get(name, np.inf))
+            header["maximum"][name] = max(float(values.max()), header["maximum"].get(name, -np.inf))
+
+            tables[f"{name}_sum"] = np.bincount(group, weights=values)
+            tables[f"{name}_min"] = np.full(len(new_days), np.inf)
+            tables[f"{name}_max"] = np.full(len(new_days), -np.inf)
+            np.minimum.at(tables[f"{name}_min"], group, values)
+            np.maximum.at(tables[f"{name}_max"], group, values)
+            tables[f"{name}_histogram"] = np.bincount(_codes(name, values))
+
+        # The snapshot's own maps are closed before their files grow
+        self._arrays = {}
+
+        for name, values in appended.items():
+            self._write(name, values, header["lengths"][name])
+            header["lengths"][name] += len(values)
+
+        header["rows"] = self.rows + len(attempt)
+        header["last_attempt"] = int(attempt[-1])
+        header["tables"] = f"tables.{header['rows']}.npz"
+        np.savez(self._path(header["tables"]), **self._mergeTables(tables))
+
+        # The header is replaced last, so an interrupted append leaves the previous snapshot intact
+        temporary = self._path(f"header.json.{os.getpid()}.tmp")
+        with open(temporary, "w") as f:
+            json.dump(header, f)
+        os.replace(temporary, self._path("header.json"))
+
+        if self.header["tables"] is not None and self.header["tables"] != header["tables"]:
+            with suppress(FileNotFoundError):
+                os.remove(self._path(self.header["tables"]))
+
+        self.header = header
+        self._load()
+
+    def _last(self, name: str, empty: float):
+        array = self._arrays[name]
+        return float(array[-1]) if len(array) else empty
+
+    def _write(self, name: str, values, length: int):
+        dtype = growing[name.split(".")[1]]
+        size = length * np.dtype(dtype).itemsize
+        mode = "r+b" if os.path.exists(self._path(name)) else "wb"
+
+        with open(self._path(name), mode) as f:
+            # Bytes past the header's length are left over from an interrupted append
+            if f.seek(0, os.SEEK_END) != size:
+                f.truncate(size)
+                f.seek(size)
+
+            f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+    def _mergeTables(self, new: dict):
+        # Daily buckets and histograms are small, merging them costs the number of days and bins, not races
+        if not self._tables:
+            return new
+
+        old = self._tables
+        days = np.union1d(old["days"], new["days"])
+        at_old = np.searchsorted(days, old["days"])
+        at_new = np.searchsorted(days, new["days"])
+        merged = {"days": days}
+
+        for name, empty, combine in (("day_count", 0, np.add), *((f"{column}_sum", 0.0, np.add) for column in series),
+                                     *((f"{column}_min", np.inf, np.minimum) for column in series),
+                                     *((f"{column}_max", -np.inf, np.maximum) for column in series)):
+            table = np.full(len(days), empty, dtype=np.result_type(old[name], new[name]))
+            table[at_old] = old[name]
+            table[at_new] = combine(table[at_new], new[name])
+            merged[name] = table
+
+        for column in series:
+            name = f"{column}_histogram"
+            histogram = np.zeros(max(len(old[name]), len(new[name])), dtype=np.int64)
+            histogram[:len(old[name])] += old[name]
+            histogram[:len(new[name])] += new[name]
+            merged[name] = histogram
+
+        return merged
+
+    def clear(self):
+        self._arrays = {}
+
+        for name in list(self.header["lengths"]) + [self.header["tables"], "header.json"]:
+            if name is not None:
+                with suppress(FileNotFoundError):
+                    os.remove(self._path(name))
+
+        self.header = self._emptyHeader()
+        self._load()
+
+    def rollingStats(self, name: str, values):
+        # values is the column the snapshot was built from, only rolling medians read it
+        return RollingStats.fromSums(values, self._arrays[f"{name}.sums"], self._arrays[f"{name}.squares"], self.header["offsets"][name])
+
+    def pbSeries(self, name: str):
+        # PB values and the index of the race that set each one
+        return self._arrays[f"{name}.pb"], self._arrays[f"{name}.pb_index"]
+
+    def buckets(self, name: str = "wpm", period: str = "day"):
+        # Same buckets as Aggregation.aggregate, without percentiles
+        if not self.rows:
+            empty = np.array([])
+            return Buckets(np.array([], dtype="datetime64[D]"), np.array([], dtype=np.int64), empty, empty, empty, {})
+
+        starts, group = np.unique(bucketStarts(self._tables["days"].astype("datetime64[D]"), period), return_inverse=True)
+        count = np.bincount(group, weights=self._tables["day_count"]).astype(np.int64)
+        low = np.full(len(starts), np.inf)
+        high = np.full(len(starts), -np.inf)
+        np.minimum.at(low, group, self._tables[f"{name}_min"])
+        np.maximum.at(high, group, self._tables[f"{name}_max"])
+
+        return Buckets(
+            start=starts,
+            count=count,
+            min=low,
+            max=high,
+            mean=np.bincount(group, weights=self._tables[f"{name}_sum"]) / count,
+            percentiles={},
+        )
+
+    def histogram(self, name: str):
+        # (values, counts, minimum, maximum), every value is the lower edge of its whole wpm or accuracy percent
+        counts = self._tables.get(f"{name}_histogram", np.zeros(0, dtype=np.int64))
+        values = np.arange(len(counts)) if name == "wpm" else accuracy_edges[:len(counts)]
+        return values, counts, self.header["minimum"].get(name), self.header["maximum"].get(name)
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+modules = ("StatsScraper", "LoadFileStats", "LoadBinaryStats", "RaceStore", "RaceHistory", "Comparison", "GraphMaker")
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def importTime(module: str):
+    # A fresh interpreter per import, -X importtime reports the cumulative microseconds of every imported module
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=root, capture_output=True, text=True, check=True)
+    times = {}
+
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+
+    return times[module] / 1e6, "matplotlib" in times
+
+
+def main(number: int = 5):
+    for module in modules:
+        seconds, loads_matplotlib = min(importTime(module) for _ in range(number))
+        print(f"{module:>16}: {1000 * seconds:7.1f} ms{'  (imports matplotlib)' if loads_matplotlib else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import glob
+import os
+from timeit import repeat
+from bs4 import BeautifulSoup
+from RowExtractor import RowExtractor
+from benchmarks.fixtures import syntheticRaces, racePage
+
+fixture_dir = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def loadFixtures():
+    paths = sorted(glob.glob(os.path.join(fixture_dir, "*.html")))
+
+    if not paths:
+        # Save a synthetic page so later runs compare against the same file, real pages can be dropped in here too
+        os.makedirs(fixture_dir, exist_ok=True)
+        path = os.path.join(fixture_dir, "synthetic_1550.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(racePage(syntheticRaces(5000), 5000, 1550))
+        paths = [path]
+
+    fixtures = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            fixtures[os.path.basename(path)] = f.read()
+
+    return fixtures
+
+
+def soupRows(html: str):
+    data = BeautifulSoup(html, 'lxml')
+    return [[i.strip() for i in item.text.strip().split("\n") if i.strip()] for item in data.find_all('div', class_="Scores__Table__Row")]
+
+
+def main(number: int = 5):
+    for name, html in loadFixtures().items():
+        assert soupRows(html) == RowExtractor.extract(html), f"{name}: extracted rows differ"
+
+        soup = min(repeat(lambda: soupRows(html), number=1, repeat=number))
+        extractor = min(repeat(lambda: RowExtractor.extract(html), number=1, repeat=number))
+        rows = len(RowExtractor.extract(html))
+
+        print(f"{name}: {rows} rows, BeautifulSoup {1000 * soup:.1f} ms, RowExtractor {1000 * extractor:.1f} ms ({soup / extractor:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
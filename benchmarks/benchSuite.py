@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+import numpy as np
+from GraphMaker import GraphMaker
+from LoadBinaryStats import LoadBinaryStats
+from LoadFileStats import LoadFileStats
+from StatsScraper import StatsScraper
+from benchmarks.fixtures import syntheticRaces, writeStatsFile
+from benchmarks.server import RaceHistoryServer
+
+default_sizes = (1_000, 100_000, 1_000_000, 10_000_000)
+trace_memory = False
+
+
+def measure(results: list, stage: str, rows: int, function, *args, **kwargs):
+    # Wall time of one stage, tracing allocations (numpy buffers included) slows the stage down so it is opt-in
+    # A trace the caller started is left running, only its peak is reset
+    was_tracing = tracemalloc.is_tracing()
+
+    if trace_memory and was_tracing:
+        tracemalloc.reset_peak()
+    elif trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+
+    try:
+        value = function(*args, **kwargs)
+        error = None
+    except Exception as e:
+        value = None
+        error = f"{type(e).__name__}: {e}"
+
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+
+    if trace_memory and not was_tracing:
+        tracemalloc.stop()
+
+    results.append({
+        "stage": stage,
+        "rows": rows,
+        "seconds": round(seconds, 6),
+        "rows_per_second": round(rows / seconds, 1) if seconds else None,
+        "peak_bytes": peak,
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "error": error,
+    })
+    memory = f"{peak / 1024 ** 2:9.1f} MiB" if peak is not None else ""
+    print(f"{stage:>32} {rows:>10} rows {seconds:9.3f} s {memory}{'  ' + error if error else ''}", file=sys.stderr)
+
+    return value
+
+
+def benchSize(rows: int, crawl_limit: int, chart_limit: int, animate: bool):
+    results = []
+    races = syntheticRaces(rows)
+    data = list(races)
+
+    if rows <= crawl_limit:
+        with RaceHistoryServer(races) as server:
+            scraper = measure(results, "StatsScraper crawl+parse", rows, StatsScraper, "bench", max_requests_per_second=None, link=server.link)
+
+        if scraper is not None:
+            measure(results, "StatsScraper.download", rows, scraper.download, "races.txt")
+            measure(results, "StatsScraper.downloadBinary", rows, scraper.downloadBinary, "races.bin")
+            data = scraper.getData()
+    else:
+        writeStatsFile(races, "races.txt")
+        LoadBinaryStats.write("races.bin", races)
+
+    measure(results, "LoadFileStats", rows, LoadFileStats, "races.txt")
+    measure(results, "LoadBinaryStats", rows, LoadBinaryStats, "races.bin")
+
+    if rows <= chart_limit:
+        graph = GraphMaker(data)
+
+        for chart in GraphMaker.charts:
+            measure(results, f"GraphMaker.{chart}", rows, getattr(graph, chart))
+
+        if animate:
+            measure(results, "GraphMaker.animateHistWPM", rows, graph.animateHistWPM)
+            measure(results, "GraphMaker.animateHistAccuracy", rows, graph.animateHistAccuracy)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times scraping, loading, storing and rendering on synthetic race histories")
+    parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes)
+    parser.add_argument("--crawl-limit", type=int, default=1_000_000, help="largest history crawled through the local server")
+    parser.add_argument("--chart-limit", type=int, default=1_000_000, help="largest history rendered by GraphMaker")
+    parser.add_argument("--no-animations", action="store_true")
+    parser.add_argument("--trace-memory", action="store_true", help="report the peak traced allocation of every stage")
+    parser.add_argument("--output", help="JSON report path, stdout when omitted")
+    arguments = parser.parse_args()
+
+    global trace_memory
+    trace_memory = arguments.trace_memory
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": [],
+    }
+    output = os.path.abspath(arguments.output) if arguments.output else None
+    working_directory = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        os.makedirs("img")
+
+        try:
+            with redirect_stdout(sys.stderr):  # StatsScraper reports progress on stdout, which carries the JSON report
+                for rows in arguments.sizes:
+                    report["results"] += benchSize(rows, arguments.crawl_limit, arguments.chart_limit, not arguments.no_animations)
+        finally:
+            os.chdir(working_directory)
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+import numpy as np
+
+months = ['Jan.', 'Feb.', 'March', 'April', 'May', 'June', 'July', 'Aug.', 'Sept.', 'Oct.', 'Nov.', 'Dec.']
+
+
+def syntheticRaces(amount: int, seed: int = 0, races_per_day: int = 40):
+    rng = np.random.default_rng(seed)
+
+    attempt = np.arange(1, amount + 1)
+    wpm = np.clip(rng.normal(60 + 40 * attempt / amount, 12), 10, 250).astype(int)
+    accuracy = np.round(np.clip(rng.normal(0.96, 0.025, amount), 0.5, 1), 3)
+    score = np.where(rng.random(amount) < 0.1, 0, rng.integers(1, 200, amount))
+    place = np.char.add(rng.integers(1, 6, amount).astype(str), "/5")
+    date = np.datetime64("2015-01-01") + (attempt // races_per_day).astype("timedelta64[D]")
+
+    return wpm, accuracy, attempt, score, place, date
+
+
+def _pageDate(day: np.datetime64):
+    current = date(1970, 1, 1) + timedelta(days=int(day.astype("datetime64[D]").astype(int)))
+    return f"{months[current.month - 1]} {current.day}, {current.year}"
+
+
+def racePage(races, start: int, amount: int, username: str = "bench", universe: str = ""):
+    # Rows of a race_history page are newest first, starting at index start - 1
+    wpm, accuracy, attempt, score, place, date = races
+    stop = max(start - amount, 0)
+    rows = []
+
+    for i in range(start - 1, stop - 1, -1):
+        rows.append(
+            '<div class="Scores__Table__Row">\n'
+            f'<div class="profileTableHeaderRaces">\n{attempt[i]}\n</div>\n'
+            f'<div class="profileTableHeaderUniverse">\n{wpm[i]} WPM\n</div>\n'
+            f'<div class="profileTableHeaderDate">\n{accuracy[i] * 100:.1f}%\n</div>\n'
+            f'<div>\n{score[i] if score[i] else "N/A"}\n</div>\n'
+            f'<div>\n{place[i]}\n</div>\n'
+            f'<div>\n{_pageDate(date[i])}\n</div>\n'
+            '</div>\n'
+        )
+
+    older = ""
+    if stop > 0:
+        older = (f'<span><a href="?user={username}&amp;n={amount}&amp;startDate={stop}&amp;universe={universe}">'
+                 '\n\n          load older results »\n        \n</a></span>')
+
+    return ('<html><head><title>Race History</title></head><body>\n'
+            '<div class="themeContent pit">\n<span>Races</span>\n<div class="Scores__Table">\n'
+            f'{"".join(rows)}</div>\n{older}\n</div>\n</body></html>\n')
+
+
+def writeStatsFile(races, path: str):
+    # Same layout as StatsScraper.download, newest race first
+    wpm, accuracy, attempt, score, place, date = races
+    dates = np.char.replace(np.asarray(date, dtype="datetime64[s]").astype(str), "T", " ")
+
+    with open(path, "w") as f:
+        for i in range(len(attempt) - 1, -1, -1):
+            f.write(f"{attempt[i]};{wpm[i]};{accuracy[i]};{score[i]};{place[i]};{dates[i]}\n")
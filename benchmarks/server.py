@@ -0,0 +1,67 @@
+import hashlib
+import random
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Thread
+from urllib.parse import urlparse, parse_qs
+from benchmarks.fixtures import racePage
+
+
+class RaceHistoryServer:
+    # Local stand-in for data.typeracer.com that renders race_history pages of a synthetic history on request
+    def __init__(self, races, host: str = "127.0.0.1", port: int = 0, error_rate: float = 0, seed: int = 0):
+        # error_rate is the share of requests answered with a 503 maintenance page, to exercise retries
+        self.races = races
+        self.requests = 0
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != "/pit/race_history":
+                    self.send_error(404)
+                    return
+
+                server.requests += 1
+                if server.error_rate and server.random.random() < server.error_rate:
+                    body = b"<html><body><h1>TypeRacer is down for maintenance</h1></body></html>"
+                    self.send_response(503)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
+                query = parse_qs(url.query)
+                start = query.get("startDate", [""])[0]
+                body = racePage(server.races, int(start) if start else len(server.races[2]), int(query.get("n", ["1550"])[0]),
+                                query.get("user", ["bench"])[0], query.get("universe", [""])[0]).encode()
+
+                etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.link = f"http://{host}:{self.httpd.server_address[1]}/pit/race_history"
+
+    def __enter__(self):
+        Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -1,10 +1,13 @@
 from GraphMaker import GraphMaker
+from RaceStore import RaceStore
 from StatsScraper import StatsScraper
 
-ss = StatsScraper("skyprompdvorak")
-gm = GraphMaker(ss.getData())
+store = RaceStore()
 
-ss2 = StatsScraper("typeracer")
-gm2 = GraphMaker(ss2.getData())
+for username in ["skyprompdvorak", "typeracer"]:
+    store.upsertScraper(StatsScraper(username, known_data=store.getData(username)))
 
-gm.overlapWPM(gm2, cutoff=True, self_name="skyprompdvorak", other_name="typeracer")
\ No newline at end of file
+gm = GraphMaker(store.getData("skyprompdvorak"))
+gm2 = GraphMaker(store.getData("typeracer"))
+
+gm.overlapWPM(gm2, cutoff=True, self_name="skyprompdvorak", other_name="typeracer")
@@ -0,0 +1,7 @@
+from Comparison import Comparison
+from RaceStore import RaceStore
+
+comparison = Comparison.fetch(["skyprompdvorak", "typeracer", "keegant"], store=RaceStore())
+
+comparison.plot(average_grouping=50, align="relative")
+print(comparison.summaryTable(ns=(10, 25, 50, 100, 1000)))
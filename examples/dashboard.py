@@ -1,16 +1,27 @@
 from GraphMaker import GraphMaker
+from RenderCache import RenderCache
+from ResponseCache import ResponseCache
 from StatsScraper import StatsScraper
 
-ss = StatsScraper("skyprompdvorak")
-gm = GraphMaker(ss.getData())
 
-smoothing = 50
+def main():
+    ss = StatsScraper("skyprompdvorak", response_cache=ResponseCache())
+    gm = GraphMaker(ss.getData(), RenderCache())
 
-gm.plotWPM(average_grouping=50)
-gm.plotAccuracy(average_grouping=50)
-gm.plotWPMAccCorrelation()
-gm.plotAccWPMCorrelation()
-gm.histDailyRaceAmounts()
-gm.histWPM()
-gm.histAccuracy()
-gm.dailyProgress()
+    smoothing = 50
+
+    gm.renderAll({
+        "plotWPM": {"average_grouping": smoothing},
+        "plotAccuracy": {"average_grouping": smoothing},
+        "plotWPMAccCorrelation": {},
+        "plotAccWPMCorrelation": {},
+        "histDailyRaceAmounts": {},
+        "histWPM": {},
+        "histAccuracy": {},
+        "dailyProgress": {},
+    })
+
+
+# The chart workers import this script again when processes are spawned (macOS, Windows)
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,17 @@
 from GraphMaker import GraphMaker
+from RenderCache import RenderCache
+from ResponseCache import ResponseCache
 from StatsScraper import StatsScraper
 
-ss = StatsScraper("skyprompdvorak")
-gm = GraphMaker(ss.getData())
 
-gm.animateHistAccuracy()
-gm.animateHistWPM()
+def main():
+    ss = StatsScraper("skyprompdvorak", response_cache=ResponseCache())
+    gm = GraphMaker(ss.getData(), RenderCache())
+
+    gm.animateHistAccuracy()
+    gm.animateHistWPM()
+
+
+# The frame workers import this script again when processes are spawned (macOS, Windows)
+if __name__ == "__main__":
+    main()
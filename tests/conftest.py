@@ -0,0 +1,18 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# The modules live at the repository root, charts are only written to files
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from benchmarks.fixtures import syntheticRaces
+
+
+@pytest.fixture
+def races():
+    # getData() order, oldest first
+    wpm, accuracy, attempt, score, place, date = syntheticRaces(2500, races_per_day=37)
+    return [wpm, accuracy, attempt, score, place, np.asarray(date, dtype="datetime64[s]")]
+
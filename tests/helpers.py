@@ -0,0 +1,8 @@
+import numpy as np
+
+names = ("wpm", "accuracy", "attempt", "score", "place", "date")
+
+
+def assertSameData(actual, expected):
+    for name, column, reference in zip(names, actual, expected):
+        np.testing.assert_array_equal(np.asarray(column), np.asarray(reference), err_msg=name)
@@ -0,0 +1,51 @@
+from collections import defaultdict
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from Aggregation import aggregate, periods
+
+
+def naiveStart(day: date, period: str):
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+@pytest.mark.parametrize("period", periods)
+def test_matchesNaiveGrouping(races, period):
+    values = races[1]
+    groups = defaultdict(list)
+    for day, value in zip(races[5].astype("datetime64[D]").tolist(), values.tolist()):
+        groups[naiveStart(day, period)].append(value)
+
+    buckets = aggregate(races[5], values, period, percentiles=(10, 50, 90))
+    starts = sorted(groups)
+
+    assert buckets.start.tolist() == starts
+    assert buckets.count.tolist() == [len(groups[start]) for start in starts]
+    assert buckets.min.tolist() == [min(groups[start]) for start in starts]
+    assert buckets.max.tolist() == [max(groups[start]) for start in starts]
+    np.testing.assert_allclose(buckets.mean, [np.mean(groups[start]) for start in starts])
+
+    for q in (10, 50, 90):
+        np.testing.assert_allclose(buckets.percentiles[q], [np.percentile(groups[start], q) for start in starts])
+
+
+def test_weeksStartOnMonday():
+    buckets = aggregate(np.array(["2024-01-07", "2024-01-08"], dtype="datetime64[s]"), [1, 2], "week")
+
+    assert buckets.start.astype(str).tolist() == ["2024-01-01", "2024-01-08"]
+
+
+@pytest.mark.parametrize("period", periods)
+def test_emptyHistory(period):
+    buckets = aggregate(np.array([], dtype="datetime64[s]"), np.array([], dtype=int), period, percentiles=(50,))
+
+    assert len(buckets.start) == len(buckets.count) == len(buckets.min) == len(buckets.mean) == len(buckets.percentiles[50]) == 0
+
+
+def test_unknownPeriod(races):
+    with pytest.raises(ValueError):
+        aggregate(races[5], races[0], "year")
@@ -0,0 +1,138 @@
+import json
+import os
+import numpy as np
+import pytest
+import requests
+import AsyncCrawler as crawler_module
+from AsyncCrawler import AsyncCrawler
+from PageFetcher import PageError
+from benchmarks.fixtures import syntheticRaces
+from benchmarks.server import RaceHistoryServer
+from helpers import assertSameData
+
+
+@pytest.fixture
+def long_races():
+    # Five pages of 1550 races
+    wpm, accuracy, attempt, score, place, date = syntheticRaces(7000, races_per_day=37)
+    return [wpm, accuracy, attempt, score, place, np.asarray(date, dtype="datetime64[s]")]
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    # Backoff sleeps are recorded instead of waited for
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(crawler_module.asyncio, "sleep", sleep)
+    return delays
+
+
+def failing(crawler, monkeypatch, failures):
+    # The first requests raise the given errors in turn (None reaches the server), later ones all reach it
+    request = crawler.fetcher.request
+    calls = []
+
+    def failingRequest(link, timeout=None):
+        calls.append(link)
+        if len(calls) <= len(failures) and failures[len(calls) - 1] is not None:
+            raise failures[len(calls) - 1]
+        return request(link, timeout)
+
+    monkeypatch.setattr(crawler.fetcher, "request", failingRequest)
+    return calls
+
+
+def test_crawlThroughServerErrors(races, delays):
+    with RaceHistoryServer(races, error_rate=0.4, seed=3) as server:
+        crawler = AsyncCrawler(max_requests_per_second=None, retries=20, link=server.link)
+        scrapers = crawler.crawl([("user", "")])
+
+        assert not crawler.errors
+        assertSameData(scrapers["user", ""].getData(), races)
+        # Every 503 is retried once with a backoff
+        assert server.requests == 2 + len(delays) and delays
+
+
+def test_retryAfterIsUsed(races, delays, monkeypatch):
+    with RaceHistoryServer(races) as server:
+        crawler = AsyncCrawler(max_requests_per_second=None, backoff_seconds=2, max_backoff_seconds=3, link=server.link)
+        calls = failing(crawler, monkeypatch, [PageError(server.link, 429, 7), PageError(server.link, 503), requests.ConnectionError(),
+                                               PageError(server.link, 200), PageError(server.link, 502)])
+        scrapers = crawler.crawl([("user", "")])
+
+        assertSameData(scrapers["user", ""].getData(), races)
+        assert len(calls) == 5 + 2
+        assert delays[0] == 7
+        # Exponential backoff capped at max_backoff_seconds, with up to 50% jitter either way
+        for attempt, delay in enumerate(delays[1:], 1):
+            assert 0.5 * min(2 * 2 ** attempt, 3) <= delay <= 1.5 * min(2 * 2 ** attempt, 3)
+
+
+@pytest.mark.parametrize("error", [PageError("", 503), requests.Timeout()])
+def test_giveUpAfterRetries(races, delays, monkeypatch, error):
+    with RaceHistoryServer(races) as server:
+        crawler = AsyncCrawler(max_requests_per_second=None, retries=3, link=server.link)
+        calls = failing(crawler, monkeypatch, [error] * 10)
+
+        assert crawler.crawl([("user", "")]) == {}
+        assert crawler.errors[("user", "")] is error
+        assert len(calls) == 4 and len(delays) == 3
+
+
+def test_clientErrorsAreNotRetried(races, delays, monkeypatch):
+    with RaceHistoryServer(races) as server:
+        crawler = AsyncCrawler(max_requests_per_second=None, link=server.link)
+        calls = failing(crawler, monkeypatch, [PageError(server.link, 404)])
+        crawler.crawl([("user", "")])
+
+        assert crawler.errors[("user", "")].status == 404
+        assert len(calls) == 1 and not delays
+
+
+def crawlUntilPage(long_races, checkpoint_dir, monkeypatch, page):
+    # Crawls the first pages and fails for good on the given one, leaving a checkpoint behind
+    with RaceHistoryServer(long_races) as server:
+        crawler = AsyncCrawler(max_requests_per_second=None, retries=0, checkpoint_dir=checkpoint_dir, checkpoint_pages=1, link=server.link)
+        failing(crawler, monkeypatch, [None] * (page - 1) + [PageError(server.link, 404)])
+        crawler.crawl([("user", "")])
+        assert ("user", "") in crawler.errors
+
+
+def test_resumeFromCheckpoint(tmp_path, long_races, monkeypatch):
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    crawlUntilPage(long_races, checkpoint_dir, monkeypatch, 4)
+
+    with open(os.path.join(checkpoint_dir, "user@.json")) as f:
+        assert json.load(f)["pages"] == 3
+
+    with RaceHistoryServer(long_races) as server:
+        scrapers = AsyncCrawler(max_requests_per_second=None, checkpoint_dir=checkpoint_dir, link=server.link).crawl([("user", "")])
+
+        assertSameData(scrapers["user", ""].getData(), long_races)
+        assert server.requests == 2
+
+    assert os.listdir(checkpoint_dir) == []
+
+
+def test_mismatchedCheckpointStartsOver(tmp_path, long_races, monkeypatch):
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    crawlUntilPage(long_races, checkpoint_dir, monkeypatch, 3)
+
+    # As if the process died between replacing the races and the state file
+    path = os.path.join(checkpoint_dir, "user@.json")
+    with open(path) as f:
+        state = json.load(f)
+    state["rows"] += 1
+    with open(path, "w") as f:
+        json.dump(state, f)
+
+    with RaceHistoryServer(long_races) as server:
+        scrapers = AsyncCrawler(max_requests_per_second=None, checkpoint_dir=checkpoint_dir, link=server.link).crawl([("user", "")])
+
+        assertSameData(scrapers["user", ""].getData(), long_races)
+        assert server.requests == 5
+
+    assert os.listdir(checkpoint_dir) == []
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from LoadBinaryStats import LoadBinaryStats
+from helpers import assertSameData
+
+
+def test_roundTrip(tmp_path, races):
+    path = str(tmp_path / "races.bin")
+    LoadBinaryStats.write(path, races)
+
+    assertSameData(LoadBinaryStats(path).getData(), races)
+
+
+def test_columnsAreMapped(tmp_path, races):
+    path = str(tmp_path / "races.bin")
+    LoadBinaryStats.write(path, races)
+
+    assert isinstance(LoadBinaryStats(path).wpm.base, np.memmap)
+
+
+def test_emptyHistory(tmp_path):
+    path = str(tmp_path / "empty.bin")
+    LoadBinaryStats.write(path, [np.array([], dtype=int), np.array([]), np.array([], dtype=int), np.array([], dtype=int),
+                                 np.array([], dtype=str), np.array([], dtype="datetime64[s]")])
+
+    assert [len(column) for column in LoadBinaryStats(path).getData()] == [0] * 6
+
+
+def test_rejectsOtherFiles(tmp_path):
+    path = tmp_path / "races.txt"
+    path.write_bytes(b"1;2;3\n")
+
+    with pytest.raises(ValueError):
+        LoadBinaryStats(str(path))
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+import requests
+from Aggregation import aggregate
+from DashboardServer import DashboardServer
+from RaceStore import RaceStore
+
+
+@pytest.fixture
+def store_path(tmp_path, races):
+    path = str(tmp_path / "races.sqlite")
+    store = RaceStore(path)
+    store.upsert("user", "", [column[:2000] for column in races])
+    store.close()
+    return path
+
+
+@pytest.fixture
+def server(store_path):
+    with DashboardServer(store_path, port=0) as server:
+        yield server
+
+
+def get(server, path, **headers):
+    return requests.get(server.link + path, headers=headers, timeout=10)
+
+
+def test_seriesWindow(server, races):
+    data = get(server, "/api/series?user=user&series=wpm&start=100&end=200&width=10000&average=10").json()
+    wpm, attempt = races[0][:2000], races[2][:2000]
+    kept = (attempt >= 100) & (attempt <= 200)
+
+    assert data["rows"] == 2000 and data["range"] == [100, 200] and data["points"] == kept.sum()
+    assert data["x"] == attempt[kept].tolist() and data["y"] == wpm[kept].astype(float).tolist()
+
+    best = np.maximum.accumulate(wpm)
+    pbs = np.flatnonzero(np.diff(best, prepend=-np.inf) > 0)
+    assert data["pb"]["x"] == [int(a) for a in attempt[pbs] if 100 <= a <= 200]
+
+
+def test_aggregatesWindow(server, races):
+    data = get(server, "/api/aggregates?user=user&series=accuracy&period=week&start=500&end=1500").json()
+    kept = slice(499, 1500)
+    buckets = aggregate(races[5][kept], races[1][kept], "week")
+
+    assert data["count"] == buckets.count.tolist()
+    assert data["start"] == buckets.start.astype("datetime64[s]").astype(np.int64).tolist()
+    np.testing.assert_allclose(data["mean"], buckets.mean, atol=5e-4)
+
+
+def test_unchangedResponseIsNotModified(server):
+    first = get(server, "/api/summary?user=user")
+    second = get(server, "/api/summary?user=user", **{"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200 and first.json()["races"] == 2000
+    assert second.status_code == 304 and second.content == b""
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+
+def test_newRacesInvalidateResponses(server, store_path, races):
+    first = get(server, "/api/summary?user=user")
+
+    store = RaceStore(store_path)
+    store.upsert("user", "", [column[2000:] for column in races])
+    store.close()
+
+    second = get(server, "/api/summary?user=user", **{"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200 and second.headers["ETag"] != first.headers["ETag"]
+    assert second.json()["races"] == len(races[0]) and second.json()["last attempt"] == int(races[2][-1])
+    # Responses of the previous revision are dropped with it
+    assert {key[3] for key in server._responses} == {int(races[2][-1])}
+
+
+@pytest.mark.parametrize("path, status", [("/api/summary", 400), ("/api/series?user=user&series=score", 400),
+                                          ("/api/series?user=user&width=wide", 400), ("/api/aggregates?user=user&period=year", 400),
+                                          ("/api/summary?user=nobody", 404), ("/api/nothing?user=user", 404)])
+def test_badRequests(server, path, status):
+    response = get(server, path)
+
+    assert response.status_code == status
+    assert "error" in response.json()
+
+
+def test_unexpectedErrorsAre500(server, monkeypatch, capsys):
+    def broken(self, account, **query):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setitem(DashboardServer.endpoints, "summary", broken)
+    response = get(server, "/api/summary?user=user")
+
+    assert response.status_code == 500
+    assert response.json() == {"error": "RuntimeError: database is locked"}
+    assert "RuntimeError" in capsys.readouterr().err
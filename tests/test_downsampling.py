@@ -0,0 +1,40 @@
+import numpy as np
+from Downsampling import gridDeduplicate, minMaxPerColumn, _cells
+
+
+def test_shortSeriesAreKept():
+    x = np.arange(40)
+    assert minMaxPerColumn(x, x, 10).tolist() == list(range(40))
+
+
+def test_minMaxPerColumnKeepsEveryColumnsExtremes(races):
+    x, y = races[2], races[0]
+    kept = minMaxPerColumn(x, y, 100)
+    column = _cells(x, 100)
+
+    for cell in np.unique(column):
+        rows = np.flatnonzero(column == cell)
+        kept_rows = np.intersect1d(kept, rows)
+
+        assert rows[0] in kept_rows and rows[-1] in kept_rows
+        assert y[kept_rows].min() == y[rows].min() and y[kept_rows].max() == y[rows].max()
+
+
+def test_gridDeduplicateKeepsTheLastPointOfEveryCell(races):
+    x, y = races[2], races[1]
+    kept = gridDeduplicate(x, y, 50, 40)
+    cell = _cells(x, 50) * 40 + _cells(y, 40)
+
+    last = {}
+    for row, value in enumerate(cell.tolist()):
+        last[value] = row
+
+    assert kept.tolist() == sorted(last.values())
+
+
+def test_constantSeries():
+    x = np.arange(1000)
+    y = np.full(1000, 3.0)
+
+    assert len(gridDeduplicate(x, y, 10, 10)) == 10
+    assert len(minMaxPerColumn(x, y, 10)) <= 40
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from benchmarks.fixtures import writeStatsFile
+from LoadFileStats import LoadFileStats
+from StatsScraper import StatsScraper
+from helpers import assertSameData
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100_000])
+def test_loadsWrittenFile(tmp_path, races, chunk_size):
+    path = str(tmp_path / "races.txt")
+    writeStatsFile(races, path)
+
+    assertSameData(LoadFileStats(path, chunk_size=chunk_size).getData(), races)
+
+
+def test_downloadLoadsBack(tmp_path, races):
+    scraper = StatsScraper("user", crawl=False, known_data=races)
+    scraper.finish()
+    path = str(tmp_path / "races.txt")
+    scraper.download(path, chunk_size=100)
+
+    assertSameData(LoadFileStats(path).getData(), races)
+
+
+def test_singleRace(tmp_path, races):
+    path = str(tmp_path / "races.txt")
+    writeStatsFile([column[:1] for column in races], path)
+
+    assert LoadFileStats(path).getData()[2].tolist() == [1]
+
+
+def test_placesAreText(tmp_path, races):
+    path = str(tmp_path / "races.txt")
+    writeStatsFile(races, path)
+
+    assert np.asarray(LoadFileStats(path).getData()[4]).dtype.kind == "U"
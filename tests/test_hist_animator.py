@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from WPMHistAnimator import WPMHistAnimator
+
+
+@pytest.fixture
+def animator(races):
+    return WPMHistAnimator(races[0])
+
+
+@pytest.mark.parametrize("spacing", ["linear", "log"])
+@pytest.mark.parametrize("step", [1, 97, 2500, 10_000])
+def test_frameEnds(animator, spacing, step):
+    ends = animator.frameEnds(step, spacing)
+
+    assert ends[-1] == len(animator.values)
+    assert ends[0] >= 1
+    assert (np.diff(ends) > 0).all()
+
+
+def test_logSpacingHasNoRepeatedFrames(animator):
+    ends = animator.frameEnds(50, "log")
+
+    assert len(ends) == len(np.unique(ends))
+    assert ends[:5].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_cumulativeCountsMatchHistograms(animator):
+    ends = animator.frameEnds(97, "linear")
+    counts = animator.cumulativeCounts(ends)
+    values = np.asarray(animator.values)
+
+    for end, frame in zip(ends, counts):
+        np.testing.assert_array_equal(frame, np.histogram(values[:end], bins=animator.bins)[0])
+
+
+def test_noRacesRaise():
+    with pytest.raises(ValueError):
+        WPMHistAnimator(np.array([50, 60])[:0]).frameEnds(1)
+
+
+def test_stepLongerThanHistorySavesOneFrame(animator, tmp_path):
+    animator.save_animation(str(tmp_path / "hist.gif"), frame_step_size=10_000, processes=1)
+
+    assert len(animator.counts) == 1
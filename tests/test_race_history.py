@@ -0,0 +1,54 @@
+import numpy as np
+from RaceHistory import RaceHistory
+from helpers import assertSameData
+
+
+def newestFirst(races):
+    return [column[::-1] for column in races]
+
+
+def test_pagesNewestFirst(races):
+    history = RaceHistory(capacity=16)
+    pages = newestFirst(races)
+
+    for start in range(0, len(races[0]), 300):
+        history.extend(*(column[start:start + 300] for column in pages))
+
+    assertSameData(history.getData(), races)
+    assertSameData(history.appended(), pages)
+    assertSameData(list(history), races)
+
+
+def test_appendOrderOldestFirst(races):
+    history = RaceHistory(newest_first=False)
+    history.extend(*races)
+
+    assertSameData(history.getData(), races)
+
+
+def test_attemptAndDateRanges(races):
+    history = RaceHistory(newest_first=False)
+    history.extend(*races)
+    attempt, date = races[2], races[5]
+
+    kept = (attempt >= 100) & (attempt <= 250)
+    assertSameData(history.attempts(100, 250), [column[kept] for column in races])
+
+    # The end date covers its whole day
+    kept = (date >= np.datetime64("2015-01-05")) & (date < np.datetime64("2015-01-08"))
+    assertSameData(history.dates("2015-01-05", "2015-01-07"), [column[kept] for column in races])
+
+
+def test_rangesAreViews(races):
+    history = RaceHistory(newest_first=False)
+    history.extend(*races)
+
+    assert np.shares_memory(history.attempts(100, 250)[0], history.column("wpm"))
+
+
+def test_placesAreCoded(races):
+    history = RaceHistory()
+    history.extend(*races)
+
+    assert sorted(history.places) == sorted(set(races[4].tolist()))
+    assert history.column("place").dtype == np.uint16
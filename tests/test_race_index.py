@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from GraphMaker import GraphMaker
+from RaceIndex import RaceIndex
+
+
+def rows(window, length):
+    return np.arange(length)[window]
+
+
+@pytest.mark.parametrize("start, end", [(None, None), (1, 2500), (100, 200), (0, 5), (2400, 3000), (300, 299), (5000, None)])
+def test_attemptsMatchMask(races, start, end):
+    index = RaceIndex(races)
+    attempt = races[2]
+    mask = (attempt >= (start if start is not None else -np.inf)) & (attempt <= (end if end is not None else np.inf))
+
+    np.testing.assert_array_equal(rows(index.attempts(start, end), len(index)), np.flatnonzero(mask))
+
+
+@pytest.mark.parametrize("start, end", [("2015-01-03", "2015-01-10"), ("2015-01-03T12", "2015-01-03T18"),
+                                        (None, "2015-01-05"), ("2015-02-01", None), ("2030-01-01", None), ("2015-01", "2015-01")])
+def test_datesMatchMask(races, start, end):
+    index = RaceIndex(races)
+    date = races[5]
+    mask = np.ones(len(date), dtype=bool)
+    if start is not None:
+        mask &= date >= np.datetime64(start)
+    if end is not None:
+        # The end covers its whole unit
+        mask &= date < np.datetime64(end) + 1
+
+    np.testing.assert_array_equal(rows(index.dates(start, end), len(index)), np.flatnonzero(mask))
+
+
+def test_endDateCoversWholeDay(races):
+    index = RaceIndex(races)
+    day = races[5][1000].astype("datetime64[D]")
+    window = index.dates(day, day)
+
+    assert (races[5][window].astype("datetime64[D]") == day).all()
+    assert (races[5].astype("datetime64[D]") == day).sum() == window.stop - window.start > 1
+
+
+@pytest.mark.parametrize("days, until", [(1, None), (0.5, None), (7, "2015-01-20"), (1000, None), (3, "2000-01-01")])
+def test_lastMatchesMask(races, days, until):
+    index = RaceIndex(races)
+    date = races[5]
+    until = np.datetime64(until, "s") if until is not None else date[-1]
+    mask = (date > until - np.timedelta64(int(days * 24 * 3600), "s")) & (date <= until)
+
+    np.testing.assert_array_equal(rows(index.last(days, until), len(index)), np.flatnonzero(mask))
+
+
+@pytest.mark.parametrize("year, name, months", [(2015, "winter", ("2014-12", "2015-01", "2015-02")),
+                                                 (2015, "spring", ("2015-03", "2015-04", "2015-05")),
+                                                 (2015, "summer", ("2015-06", "2015-07", "2015-08"))])
+def test_seasonMatchesMask(races, year, name, months):
+    index = RaceIndex(races)
+    mask = np.isin(races[5].astype("datetime64[M]"), np.array(months, dtype="datetime64[M]"))
+
+    np.testing.assert_array_equal(rows(index.season(year, name), len(index)), np.flatnonzero(mask))
+
+    with pytest.raises(ValueError):
+        index.season(year, "monsoon")
+
+
+def test_emptyIndex(races):
+    index = RaceIndex([column[:0] for column in races])
+
+    assert index.last(7) == slice(0, 0)
+    assert rows(index.attempts(1, 10), 0).size == rows(index.dates("2015-01-01", "2016-01-01"), 0).size == 0
+
+
+def test_viewsShareMemory(races):
+    index = RaceIndex(races)
+    view = index.view(index.attempts(100, 200))
+
+    for column, full in zip(view, races):
+        assert np.shares_memory(column, full)
+    np.testing.assert_array_equal(view[2], np.arange(100, 201))
+
+
+def test_windowedChartsUseWindowRows(races):
+    graph = GraphMaker(races)
+    window = graph.index.attempts(100, 200)
+    windowed = graph.inWindow(window)
+
+    assert windowed is graph.inWindow(slice(window.start, window.stop))
+    np.testing.assert_array_equal(windowed.wpm, races[0][window])
+    assert np.shares_memory(windowed.wpm, races[0])
@@ -0,0 +1,64 @@
+import numpy as np
+from RaceStore import RaceStore
+from StatsScraper import StatsScraper
+from benchmarks.server import RaceHistoryServer
+from helpers import assertSameData
+
+
+def test_roundTrip(tmp_path, races):
+    store = RaceStore(str(tmp_path / "races.sqlite"))
+    store.upsert("user", "", races)
+
+    assertSameData(store.getData("user"), races)
+    assert store.lastAttempt("user") == races[2][-1]
+    assert store.getData("other")[2].tolist() == []
+
+
+def test_rangesAreInclusive(tmp_path, races):
+    store = RaceStore(str(tmp_path / "races.sqlite"))
+    store.upsert("user", "", races)
+    attempt, date = races[2], races[5]
+
+    kept = (attempt >= 100) & (attempt <= 200)
+    assertSameData(store.getData("user", start_attempt=100, end_attempt=200), [column[kept] for column in races])
+
+    kept = (date >= date[500]) & (date <= date[900])
+    assertSameData(store.getData("user", start_date=date[500], end_date=date[900]), [column[kept] for column in races])
+
+
+def test_upsertReplacesKnownAttempts(tmp_path, races):
+    store = RaceStore(str(tmp_path / "races.sqlite"))
+    store.upsert("user", "", [column[:1000] for column in races])
+    changed = [np.array(column[900:]) for column in races]
+    changed[0][:] = 1
+    store.upsert("user", "", changed)
+
+    wpm = store.getData("user")[0]
+    assert len(wpm) == len(races[0])
+    assert (wpm[:900] == races[0][:900]).all() and (wpm[900:] == 1).all()
+
+
+def test_accountsAreSeparate(tmp_path, races):
+    store = RaceStore(str(tmp_path / "races.sqlite"))
+    store.upsert("user", "", races)
+    store.upsert("user", "play", [column[:10] for column in races])
+
+    assert store.accounts() == [("user", ""), ("user", "play")]
+    assert len(store.getData("user", "play")[0]) == 10
+
+
+def test_upsertScraperWritesOnlyNewRaces(tmp_path, races):
+    store = RaceStore(str(tmp_path / "races.sqlite"))
+    store.upsert("user", "", [column[:2000] for column in races])
+
+    with RaceHistoryServer(races) as server:
+        for expected in (500, 0):
+            written = store.connection.total_changes
+            store.upsertScraper(StatsScraper("user", link=server.link, max_requests_per_second=None, known_data=store.getData("user")))
+
+            assert store.connection.total_changes - written == expected
+
+        store.upsertScraper(StatsScraper("other", link=server.link, max_requests_per_second=None))
+
+    assertSameData(store.getData("user"), races)
+    assertSameData(store.getData("other"), races)
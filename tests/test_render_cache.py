@@ -0,0 +1,54 @@
+import os
+import pytest
+import Instrumentation
+from GraphMaker import GraphMaker
+from RenderCache import RenderCache
+
+
+@pytest.fixture
+def graph(tmp_path, races, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("img")
+    return GraphMaker(races, RenderCache(str(tmp_path / "cache")))
+
+
+@pytest.fixture
+def metrics():
+    metrics = Instrumentation.enable()
+    yield lambda name: sum(counter["value"] for counter in metrics.toDict()["counters"] if counter["name"] == name)
+    Instrumentation.disable()
+
+
+def test_sameInputsHitTheCache(graph, metrics):
+    graph.histWPM()
+    graph.histWPM()
+
+    assert metrics("render_cache_misses") == 1
+    assert metrics("render_cache_hits") == 1
+
+
+def test_otherParametersMiss(graph, metrics):
+    graph.plotAccuracy(average_grouping=10)
+    graph.plotAccuracy(average_grouping=20)
+
+    assert metrics("render_cache_misses") == 2
+
+
+def test_otherDataMisses(graph, races, metrics):
+    graph.histWPM()
+    GraphMaker([column[:-1] for column in races], graph.render_cache).histWPM()
+
+    assert metrics("render_cache_misses") == 2
+
+
+def test_deletedOutputIsRestored(graph, metrics):
+    graph.histWPM()
+    with open("img/histWPM.png", "rb") as f:
+        rendered = f.read()
+
+    os.remove("img/histWPM.png")
+    graph.histWPM()
+
+    assert metrics("render_cache_hits") == 1
+    with open("img/histWPM.png", "rb") as f:
+        assert f.read() == rendered
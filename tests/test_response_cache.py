@@ -0,0 +1,86 @@
+import os
+import time
+import pytest
+from benchmarks.server import RaceHistoryServer
+from PageFetcher import PageFetcher
+from ResponseCache import ResponseCache
+from StatsScraper import StatsScraper
+from helpers import assertSameData
+
+first = "https://example.com/pit/race_history?user=u&n=10&startDate=&universe="
+older = "https://example.com/pit/race_history?user=u&n=10&startDate=100&universe="
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "pages"))
+
+
+def test_storedPageLoadsBack(cache):
+    cache.store(first, "<html>page</html>", {"ETag": '"abc"', "Last-Modified": "yesterday"})
+    entry = cache.load(first)
+
+    assert entry["text"] == "<html>page</html>"
+    assert ResponseCache.conditionalHeaders(entry) == {"If-None-Match": '"abc"', "If-Modified-Since": "yesterday"}
+    assert cache.load(older) is None
+
+
+def test_onlyCursorPagesStayFresh(cache):
+    cache.store(first, "new", {})
+    cache.store(older, "old", {})
+
+    assert not cache.isFresh(first, cache.load(first))
+    assert cache.isFresh(older, cache.load(older))
+
+    cache.max_age_seconds = 60
+    assert cache.isFresh(first, cache.load(first))
+
+
+@pytest.mark.parametrize("content", [b"", b"garbage", b"x\x9c\x03\x00"])
+def test_corruptEntryIsAMissAndRemoved(cache, content):
+    cache.store(first, "page", {})
+    path = cache._entry(first)
+    with open(path, "wb") as f:
+        f.write(content)
+
+    assert cache.load(first) is None
+    assert not os.path.exists(path)
+
+
+def test_leastRecentlyUsedAreEvicted(cache):
+    links = [f"{older}&page={i}" for i in range(6)]
+
+    for i, link in enumerate(links):
+        cache.store(link, os.urandom(400).hex(), {})
+        os.utime(cache._entry(link), (time.time() - 100 + i, time.time() - 100 + i))
+
+    cache.max_bytes = 3 * os.path.getsize(cache._entry(links[-1]))
+    cache.store(f"{older}&page=last", os.urandom(400).hex(), {})
+
+    assert cache.load(links[0]) is None
+    assert cache.load(links[-1]) is not None
+    assert sum(entry.stat().st_size for entry in os.scandir(cache.directory)) <= cache.max_bytes
+
+
+def test_secondScrapeOnlyRevalidatesTheFirstPage(tmp_path, races):
+    cache = ResponseCache(str(tmp_path / "pages"))
+
+    with RaceHistoryServer(races) as server:
+        link = server.link
+        scraped = StatsScraper("u", link=link, max_requests_per_second=None, response_cache=cache)
+        pages = server.requests
+
+        server.requests = 0
+        again = StatsScraper("u", link=link, max_requests_per_second=None, response_cache=cache)
+
+        assert pages > 1
+        assert server.requests == 1
+
+    assertSameData(again.getData(), scraped.getData())
+
+
+def test_fetcherServesFreshPagesFromTheCache(cache):
+    cache.store(older, "<div class=\"themeContent pit\"></div>", {})
+
+    assert PageFetcher("https://example.com", cache=cache).cached(older) is not None
+    assert PageFetcher("https://example.com", cache=cache).cached(first) is None
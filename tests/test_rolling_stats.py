@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from RollingStats import RollingStats
+
+
+@pytest.fixture(params=["wpm", "accuracy"])
+def values(request, races):
+    return races[0] if request.param == "wpm" else races[1]
+
+
+def naiveWindows(values, n):
+    return np.array([np.mean(values[i:i + n]) for i in range(len(values) - n + 1)])
+
+
+@pytest.mark.parametrize("n", [1, 2, 10, 137])
+def test_averagesOfN(values, n):
+    np.testing.assert_allclose(RollingStats(values).averagesOfN(n), naiveWindows(values, n))
+
+
+@pytest.mark.parametrize("n", [1, 10, 5000])
+def test_runningAverageOfN(values, n):
+    expected = [np.mean(values[max(i - n + 1, 0):i + 1]) for i in range(len(values))]
+
+    np.testing.assert_allclose(RollingStats(values).runningAverageOfN(n), expected)
+
+
+def test_runningAverage(values):
+    np.testing.assert_allclose(RollingStats(values).runningAverage(), np.cumsum(values) / np.arange(1, len(values) + 1))
+
+
+def test_bestWorstAndMeanAverageOfN(values):
+    stats = RollingStats(values)
+    ns = [1, 10, 25, 100, len(values)]
+    best = stats.bestAverageOfN(ns)
+    worst = stats.worstAverageOfN(ns)
+
+    for i, n in enumerate(ns):
+        windows = naiveWindows(values, n)
+        assert best[0][i] == np.argmax(windows) and worst[0][i] == np.argmin(windows)
+        np.testing.assert_allclose([best[1][i], worst[1][i]], [windows.max(), windows.min()])
+
+    np.testing.assert_allclose(stats.meanAverageOfN(ns), [naiveWindows(values, n).mean() for n in ns])
+
+
+def test_windowsLongerThanTheHistory(values):
+    stats = RollingStats(values[:5])
+
+    assert len(stats.averagesOfN(6)) == 0
+    assert len(stats.rollingMedian(6)) == 0
+
+    with pytest.raises(ValueError):
+        stats.bestAverageOfN([6])
+
+
+@pytest.mark.parametrize("n", [1, 2, 9, 50])
+def test_rollingStd(values, n):
+    # Prefix sums of squares carry rounding of about 1e-10 into the variance, so it is compared before the square root
+    expected = [np.var(values[i:i + n]) for i in range(len(values) - n + 1)]
+
+    np.testing.assert_allclose(RollingStats(values).rollingStd(n) ** 2, expected, atol=1e-8)
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 10, 11, 400])
+def test_rollingMedian(values, n):
+    expected = [np.median(values[i:i + n]) for i in range(len(values) - n + 1)]
+
+    np.testing.assert_array_equal(RollingStats(values).rollingMedian(n), expected)
+
+
+def test_rollingMedianWithRepeatedValues():
+    values = np.array([5, 5, 1, 5, 5, 1, 1, 1, 5, 9, 9, 5])
+
+    for n in range(1, len(values) + 1):
+        expected = [np.median(values[i:i + n]) for i in range(len(values) - n + 1)]
+        np.testing.assert_array_equal(RollingStats(values).rollingMedian(n), expected)
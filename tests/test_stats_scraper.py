@@ -0,0 +1,39 @@
+from datetime import datetime
+import numpy as np
+import pytest
+from benchmarks.server import RaceHistoryServer
+from StatsScraper import StatsScraper
+from helpers import assertSameData
+
+
+@pytest.fixture
+def server(races):
+    with RaceHistoryServer(races) as server:
+        yield server
+
+
+def scrape(server, **kwargs):
+    return StatsScraper("u", link=server.link, max_requests_per_second=None, **kwargs)
+
+
+def test_fullScrape(server, races):
+    assertSameData(scrape(server).getData(), races)
+
+
+@pytest.mark.parametrize("known", [2499, 2000, 900])
+def test_incrementalSyncFetchesOnlyNewPages(server, races, known):
+    server.requests = 0
+    synced = scrape(server, known_data=[column[:known] for column in races])
+
+    assertSameData(synced.getData(), races)
+    # Pages hold 1550 races, the sync stops on the page that reaches the last known race
+    assert server.requests == 1 + (len(races[0]) - known) // 1550
+
+
+def test_startDateFiltersKnownRacesToo(server, races):
+    start_date = datetime(2015, 1, 20)
+    synced = scrape(server, start_date=start_date, known_data=[column[:2000] for column in races])
+
+    kept = races[5] >= np.datetime64(start_date, "s")
+    assertSameData(synced.getData(), [column[kept] for column in races])
+    assertSameData(scrape(server, start_date=start_date).getData(), [column[kept] for column in races])
@@ -0,0 +1,109 @@
+import os
+import numpy as np
+import pytest
+from Aggregation import aggregate
+from GraphMaker import GraphMaker
+from RaceHistory import RaceHistory
+from RollingStats import RollingStats
+from StatsSnapshot import StatsSnapshot, accuracy_edges
+
+
+def build(directory, races, batches):
+    snapshot = StatsSnapshot(str(directory))
+    for end in batches:
+        snapshot.update([column[:end] for column in races])
+    return StatsSnapshot(str(directory))
+
+
+@pytest.mark.parametrize("batches", [[2500], [5, 1000, 1001, 2500], [1, 2, 3, 2500]])
+def test_snapshotMatchesDirectStats(tmp_path, races, batches):
+    wpm, accuracy, attempt, score, place, date = races
+    snapshot = build(tmp_path, races, batches)
+
+    assert snapshot.rows == len(wpm) and snapshot.covers(attempt)
+
+    for name, values in (("wpm", wpm), ("accuracy", accuracy)):
+        values = np.asarray(values, dtype=float)
+        direct = RollingStats(values)
+        stats = snapshot.rollingStats(name, values)
+        for n in (1, 10, 100):
+            np.testing.assert_allclose(stats.runningAverageOfN(n), direct.runningAverageOfN(n))
+        np.testing.assert_allclose(stats.runningAverage(), direct.runningAverage())
+        np.testing.assert_allclose(stats.rollingStd(50), direct.rollingStd(50), atol=1e-6)
+
+        pb, index = snapshot.pbSeries(name)
+        best = np.maximum.accumulate(values)
+        expected = np.flatnonzero(np.diff(best, prepend=-np.inf) > 0)
+        np.testing.assert_array_equal(index, expected)
+        np.testing.assert_array_equal(pb, values[expected])
+
+        for period in ("day", "week", "month"):
+            buckets, reference = snapshot.buckets(name, period), aggregate(date, values, period)
+            np.testing.assert_array_equal(buckets.start, reference.start)
+            np.testing.assert_array_equal(buckets.count, reference.count)
+            np.testing.assert_array_equal(buckets.min, reference.min)
+            np.testing.assert_array_equal(buckets.max, reference.max)
+            np.testing.assert_allclose(buckets.mean, reference.mean)
+
+    values, counts, minimum, maximum = snapshot.histogram("wpm")
+    np.testing.assert_array_equal(counts, np.bincount(np.asarray(wpm).astype(np.int64)))
+    assert (minimum, maximum) == (wpm.min(), wpm.max())
+
+    values, counts, minimum, maximum = snapshot.histogram("accuracy")
+    reference, _ = np.histogram(accuracy, accuracy_edges)
+    np.testing.assert_array_equal(np.pad(counts, (0, len(reference) - len(counts))), reference)
+    np.testing.assert_array_equal(values, accuracy_edges[:len(counts)])
+
+
+def test_emptySnapshot(tmp_path, races):
+    snapshot = StatsSnapshot(str(tmp_path / "empty"))
+
+    assert snapshot.rows == 0 and snapshot.covers(races[2][:0])
+    assert not snapshot.covers(races[2])
+    assert len(snapshot.buckets("wpm", "week").start) == 0
+    assert len(snapshot.histogram("wpm")[1]) == 0
+
+
+def test_replacedHistoryIsRebuilt(tmp_path, races):
+    snapshot = build(tmp_path, races, [2000])
+    replaced = [column[:1500].copy() for column in races]
+    replaced[2][-1] += 1
+
+    snapshot.update(replaced)
+    direct = build(tmp_path / "direct", replaced, [1500])
+
+    assert snapshot.rows == 1500 and snapshot.last_attempt == direct.last_attempt
+    np.testing.assert_allclose(snapshot.rollingStats("wpm", replaced[0]).runningAverage(),
+                               RollingStats(replaced[0]).runningAverage())
+    assert len(os.listdir(tmp_path)) == len(os.listdir(tmp_path / "direct")) + 1
+
+
+def test_olderRacesCanNotBeAppended(tmp_path, races):
+    wpm, accuracy, attempt, score, place, date = races
+    snapshot = build(tmp_path, races, [1000])
+
+    with pytest.raises(ValueError):
+        snapshot.append(wpm[500:600], accuracy[500:600], attempt[500:600], date[500:600])
+    assert snapshot.rows == 1000
+
+
+def test_leftoverBytesAreDropped(tmp_path, races):
+    build(tmp_path, races, [1000])
+    # An append that died before replacing the header leaves bytes past the recorded length
+    with open(tmp_path / "wpm.sums", "ab") as f:
+        f.write(np.ones(7).tobytes())
+
+    snapshot = StatsSnapshot(str(tmp_path)).update(races)
+    np.testing.assert_allclose(snapshot.rollingStats("wpm", races[0]).runningAverage(), RollingStats(races[0]).runningAverage())
+
+
+def test_graphFromRaceHistory(tmp_path, races):
+    history = RaceHistory(newest_first=False)
+    history.extend(*races)
+    snapshot = StatsSnapshot(str(tmp_path)).update(history)
+
+    graph = GraphMaker(history, snapshot=snapshot)
+    np.testing.assert_array_equal(graph.attempt, races[2])
+
+    with pytest.raises(ValueError):
+        GraphMaker([column[:-1] for column in races], snapshot=snapshot)